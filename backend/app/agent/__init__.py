@@ -1,7 +1,7 @@
 # AI Agent module for room booking
-from app.agent.graph import create_agent_graph
+from app.agent.graph import create_agent_graph, get_agent_graph
 from app.agent.tools import get_agent_tools
 
-__all__ = ["create_agent_graph", "get_agent_tools"]
+__all__ = ["create_agent_graph", "get_agent_graph", "get_agent_tools"]
 
 
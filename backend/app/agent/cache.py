@@ -0,0 +1,268 @@
+"""
+Response and tool-result cache for the booking assistant.
+
+Most chat traffic is the same handful of catalog questions. Two tiers avoid
+repeating the work:
+- tool results of read-only tools, keyed on tool name and arguments
+- final responses to the opening question of an anonymous conversation,
+  keyed on the normalized message (optionally matched by embedding
+  similarity when AGENT_CACHE_EMBEDDING_MODEL is set; needs the
+  sentence-transformers package)
+
+Entries expire after a TTL and carry tags ("spaces", "bookings:<space_id>")
+so space and booking writes can drop exactly what they made stale.
+"""
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SPACES_TAG = "spaces"
+
+# Tools whose output depends only on their arguments and the catalog/bookings
+CACHEABLE_TOOLS = ("search_spaces", "check_availability")
+
+
+def bookings_tag(space_id: int) -> str:
+    return f"bookings:{space_id}"
+
+
+def normalize_message(message: str) -> str:
+    """Collapse case, punctuation and spacing ("RM 80?" and "rm80" match)."""
+    text = message.lower()
+    text = re.sub(r"\brm\s+(?=\d)", "rm", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def _numbers(text: str) -> list[str]:
+    return re.findall(r"\d+", text)
+
+
+def tool_tags(name: str, args: dict) -> Optional[frozenset[str]]:
+    """Invalidation tags for a tool call, or None if its result can't be cached."""
+    if name == "search_spaces":
+        return frozenset((SPACES_TAG,))
+    if name == "check_availability":
+        return frozenset((SPACES_TAG, bookings_tag(args.get("space_id"))))
+    return None
+
+
+class TTLCache:
+    """Bounded LRU of values that expire after a TTL and can be dropped by tag."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, frozenset[str], str]] = OrderedDict()
+        # Invalidation clock: ticks on every invalidate/clear, remembering
+        # when each tag (and the whole cache) was last dropped
+        self._clock = 0
+        self._tag_invalidated: dict[str, int] = {}
+        self._cleared = 0
+
+    def generation(self) -> int:
+        """Take before computing a value; pass it to `put` to drop the value
+        if an invalidation of its tags happened meanwhile."""
+        return self._clock
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(
+        self,
+        key: str,
+        value: str,
+        tags: Iterable[str] = (),
+        generation: Optional[int] = None,
+    ) -> None:
+        tags = frozenset(tags)
+        if generation is not None and (
+            self._cleared > generation
+            or any(self._tag_invalidated.get(tag, 0) > generation for tag in tags)
+        ):
+            return
+        self._entries[key] = (time.monotonic() + self._ttl_seconds, tags, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tag: str) -> None:
+        self._clock += 1
+        self._tag_invalidated[tag] = self._clock
+        stale = [key for key, (_, tags, _) in self._entries.items() if tag in tags]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._clock += 1
+        self._cleared = self._clock
+        self._entries.clear()
+
+
+class SemanticIndex:
+    """Nearest-neighbour lookup of cached questions by embedding similarity.
+
+    Embedding is CPU-bound, so it runs in a worker thread rather than on
+    the event loop.
+    """
+
+    def __init__(self, model_name: str, threshold: float, max_entries: int):
+        self._model_name = model_name
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._model = None
+        self._model_lock = threading.Lock()
+        # Cache key -> embedding of its question, oldest first
+        self._vectors: OrderedDict[str, object] = OrderedDict()
+
+    def _encode(self, text: str):
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(self._model_name)
+        return self._model.encode(text, normalize_embeddings=True)
+
+    async def _embed(self, text: str):
+        return await asyncio.to_thread(self._encode, text)
+
+    async def lookup(self, text: str) -> Optional[str]:
+        """Key of the most similar cached question above the threshold."""
+        if not self._vectors:
+            return None
+        import numpy as np
+
+        vector = await self._embed(text)
+        # Snapshot after the await; other requests may have changed the index
+        keys = list(self._vectors)
+        if not keys:
+            return None
+        scores = np.stack([self._vectors[key] for key in keys]) @ vector
+        best = int(scores.argmax())
+        return keys[best] if scores[best] >= self._threshold else None
+
+    async def add(self, text: str, key: str) -> None:
+        # A key stands for one normalized question, so its vector never changes
+        if key in self._vectors:
+            self._vectors.move_to_end(key)
+            return
+        vector = await self._embed(text)
+        self._vectors[key] = vector
+        while len(self._vectors) > self._max_entries:
+            self._vectors.popitem(last=False)
+
+    def prune(self, live: TTLCache) -> None:
+        """Forget questions whose responses expired or were invalidated."""
+        for key in [key for key in self._vectors if key not in live]:
+            del self._vectors[key]
+
+
+def _load_semantic_index() -> Optional[SemanticIndex]:
+    if not settings.agent_cache_embedding_model:
+        return None
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        logger.warning(
+            "AGENT_CACHE_EMBEDDING_MODEL is set but sentence-transformers is not installed; "
+            "using exact-match response caching only"
+        )
+        return None
+    return SemanticIndex(
+        settings.agent_cache_embedding_model,
+        settings.agent_cache_similarity_threshold,
+        settings.agent_cache_max_entries,
+    )
+
+
+class AgentCache:
+    def __init__(self):
+        self.responses = TTLCache(
+            settings.agent_response_cache_ttl_seconds, settings.agent_cache_max_entries
+        )
+        self.tools = TTLCache(
+            settings.agent_tool_cache_ttl_seconds, settings.agent_cache_max_entries
+        )
+        self.semantic = _load_semantic_index()
+
+    @staticmethod
+    def _response_key(message: str) -> str:
+        # Answers mention relative dates ("tomorrow"), so they only hold for a day
+        return f"{date.today().isoformat()}|{normalize_message(message)}"
+
+    @staticmethod
+    def tool_key(name: str, args: dict) -> str:
+        return f"{date.today().isoformat()}|{name}|{json.dumps(args, sort_keys=True, default=str)}"
+
+    async def get_response(self, message: str) -> Optional[str]:
+        key = self._response_key(message)
+        response = self.responses.get(key)
+        if response is None and self.semantic is not None:
+            day, text = key.split("|", 1)
+            similar = await self.semantic.lookup(text)
+            # Near-identical wording can still differ in what matters most:
+            # "under RM80" vs "under RM90" must not share an answer
+            if similar is not None:
+                similar_day, similar_text = similar.split("|", 1)
+                if similar_day == day and _numbers(similar_text) == _numbers(text):
+                    response = self.responses.get(similar)
+        return response
+
+    async def put_response(
+        self,
+        message: str,
+        response: str,
+        tags: Iterable[str],
+        generation: Optional[int] = None,
+    ) -> None:
+        """Cache a response; `generation` is `responses.generation()` from
+        before the run, so an answer made stale during it is dropped."""
+        key = self._response_key(message)
+        self.responses.put(key, response, tags, generation)
+        if self.semantic is not None and key in self.responses:
+            await self.semantic.add(normalize_message(message), key)
+
+    def invalidate_spaces(self) -> None:
+        """Call after committing a change to any space."""
+        self.tools.invalidate(SPACES_TAG)
+        self.responses.invalidate(SPACES_TAG)
+        if self.semantic is not None:
+            self.semantic.prune(self.responses)
+
+    def invalidate_bookings(self, space_id: int) -> None:
+        """Call after committing a booking change for `space_id`."""
+        tag = bookings_tag(space_id)
+        self.tools.invalidate(tag)
+        self.responses.invalidate(tag)
+        if self.semantic is not None:
+            self.semantic.prune(self.responses)
+
+    def clear(self) -> None:
+        self.tools.clear()
+        self.responses.clear()
+        if self.semantic is not None:
+            self.semantic.prune(self.responses)
+
+
+agent_cache = AgentCache()
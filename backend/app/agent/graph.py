@@ -1,15 +1,30 @@
 """
-LangGraph agent for room booking with Amazon Bedrock.
+LangGraph agent for room booking (Amazon Bedrock unless AGENT_LLM_PROVIDER says otherwise).
 """
-import os
-from typing import Annotated, TypedDict, Sequence, Optional
+import uuid
+from typing import Annotated, AsyncIterator, TypedDict, Sequence, Optional
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, ToolMessage
-from langchain_aws import ChatBedrockConverse
+from langchain_core.language_models.chat_models import BaseChatModel
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.errors import GraphRecursionError
 from langgraph.graph import StateGraph, END
+from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agent.tools import get_agent_tools
+from app.agent.cache import agent_cache, tool_tags
+from app.agent.intents import Intent, match_intent
+from app.agent.llm import create_chat_model
+from app.agent.memory import (
+    BoundedMemorySaver,
+    content_text,
+    split_for_summary,
+    summarize_messages,
+    thread_key,
+)
+from app.agent.metrics import RunStats, agent_metrics
+from app.agent.render import render_tool_output
+from app.agent.tools import RunMemo, get_agent_tools
+from app.core.config import settings
 from app.models.user import User
 
 # System prompt for the booking assistant
@@ -43,52 +58,60 @@ Guidelines:
 - Use Ringgit Malaysia (RM) for prices
 - Format dates as YYYY-MM-DD
 - Use 24-hour format for times (9 for 9 AM, 14 for 2 PM, etc.)
+- When comparing several spaces or dates, request all the availability checks in the same step; they run in parallel
+- Tool results are compact JSON; present them to the user as readable text, never as raw JSON
 
 Current date context will be provided. Help users find the perfect workspace!"""
 
 
 class AgentState(TypedDict):
     """State for the agent graph."""
-    messages: Annotated[Sequence[BaseMessage], lambda x, y: x + y]
+    messages: Annotated[Sequence[BaseMessage], add_messages]
+    # Running summary of turns folded out of `messages`
+    summary: str
 
 
-def create_agent_graph(db: AsyncSession, user: Optional[User] = None):
-    """Create a LangGraph agent with Bedrock and booking tools."""
-    
-    # Get the Bedrock model ARN from environment or use default
-    model_id = os.getenv(
-        "BEDROCK_MODEL_ID",
-        "amazon.nova-pro-v1:0"
-    )
-    region = os.getenv("AWS_REGION", "us-east-1")
-    
-    # Initialize Bedrock chat model using Converse API (supports Nova, Claude, and other models)
-    llm = ChatBedrockConverse(
-        model=model_id,
-        region_name=region,
-        max_tokens=1024,
-        temperature=0.7,
-    )
-    
-    # Get tools with db session and user context
-    tools = get_agent_tools(db, user)
+def create_agent_graph(
+    llm: Optional[BaseChatModel] = None,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+):
+    """Create a LangGraph agent with the configured chat model and booking tools.
+
+    The graph holds no per-request state: the user is passed to each run as
+    config["configurable"]["user"], tools open their own database sessions,
+    and the conversation lives in the checkpointer under
+    config["configurable"]["thread_id"].
+    """
+    if llm is None:
+        llm = create_chat_model()
+
+    # Tools read the user (and this run's memo) from the run config
+    tools = get_agent_tools()
     
     # Bind tools to the model
     llm_with_tools = llm.bind_tools(tools)
     
     # Create tool node
     tool_node = ToolNode(tools)
+
+    async def summarize(state: AgentState) -> dict:
+        """Fold turns older than the history window into the running summary."""
+        messages = list(state["messages"])
+        cut = split_for_summary(messages, settings.agent_history_window)
+        if not cut:
+            return {"summary": state.get("summary", "")}
+        return await summarize_messages(llm, state.get("summary", ""), messages[:cut])
     
     # Define the agent function
     async def call_agent(state: AgentState) -> dict:
         """Call the agent with the current state."""
-        messages = list(state["messages"])
-        
-        # Add system message if not present
-        if not messages or not isinstance(messages[0], SystemMessage):
-            from datetime import date
-            system_with_date = f"{SYSTEM_PROMPT}\n\nToday's date: {date.today().isoformat()}"
-            messages = [SystemMessage(content=system_with_date)] + messages
+        from datetime import date
+
+        system_prompt = f"{SYSTEM_PROMPT}\n\nToday's date: {date.today().isoformat()}"
+        if state.get("summary"):
+            system_prompt += f"\n\nSummary of the earlier conversation:\n{state['summary']}"
+
+        messages = [SystemMessage(content=system_prompt)] + list(state["messages"])
         
         response = await llm_with_tools.ainvoke(messages)
         return {"messages": [response]}
@@ -110,11 +133,13 @@ def create_agent_graph(db: AsyncSession, user: Optional[User] = None):
     workflow = StateGraph(AgentState)
     
     # Add nodes
+    workflow.add_node("summarize", summarize)
     workflow.add_node("agent", call_agent)
     workflow.add_node("tools", tool_node)
     
-    # Set entry point
-    workflow.set_entry_point("agent")
+    # Set entry point: bound the history before the first model call
+    workflow.set_entry_point("summarize")
+    workflow.add_edge("summarize", "agent")
     
     # Add conditional edges
     workflow.add_conditional_edges(
@@ -130,45 +155,192 @@ def create_agent_graph(db: AsyncSession, user: Optional[User] = None):
     workflow.add_edge("tools", "agent")
     
     # Compile the graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+
+_agent_graph = None
+
+
+def init_agent_graph(checkpointer: BaseCheckpointSaver):
+    """Build the shared agent graph around the app's checkpointer (at startup)."""
+    global _agent_graph
+    _agent_graph = create_agent_graph(checkpointer=checkpointer)
+    return _agent_graph
+
+
+def get_agent_graph():
+    """Compiled agent graph, built once per process and shared by all requests."""
+    global _agent_graph
+    if _agent_graph is None:
+        _agent_graph = create_agent_graph(checkpointer=BoundedMemorySaver(
+            settings.agent_memory_max_threads, settings.agent_memory_thread_ttl_seconds
+        ))
+    return _agent_graph
+
+
+def _run_input(
+    message: str,
+    thread_id: Optional[str],
+    conversation_history: Optional[list[dict]],
+) -> tuple[dict, str]:
+    """Graph input and thread id for a turn.
+
+    Only the new message is sent for an existing thread. A new thread may be
+    seeded from client-side history (clients that predate thread_id).
+    """
+    messages: list[BaseMessage] = []
+
+    if thread_id is None:
+        thread_id = uuid.uuid4().hex
+        for msg in conversation_history or []:
+            if msg["role"] == "user":
+                messages.append(HumanMessage(content=msg["content"]))
+            elif msg["role"] == "assistant":
+                messages.append(AIMessage(content=msg["content"]))
+
+    # Add the new user message
+    messages.append(HumanMessage(content=message))
+    return {"messages": messages}, thread_id
+
+
+BUDGET_EXHAUSTED_REPLY = (
+    "Sorry, I couldn't finish that request within my step limit. "
+    "Could you break it into smaller questions?"
+)
+
+
+def _run_config(user: Optional[User], thread_id: str, stats: RunStats) -> dict:
+    # Tools open their own pooled sessions; only the user is passed through
+    return {
+        "callbacks": [stats],
+        # summarize + (agent, tools) per tool round + the final agent step
+        "recursion_limit": 2 * settings.agent_max_tool_rounds + 2,
+        "configurable": {
+            "user": user,
+            "thread_id": thread_key(thread_id, user.id if user else None),
+            # Shared by this run's tool calls only
+            "memo": RunMemo(),
+        }
+    }
+
+
+def _is_opening_anonymous_turn(
+    user: Optional[User],
+    thread_id: Optional[str],
+    conversation_history: Optional[list[dict]],
+) -> bool:
+    """Only a conversation's first anonymous question has a context-free answer."""
+    return user is None and thread_id is None and not conversation_history
+
+
+def _cache_tags(tool_calls: list[tuple[str, dict]]) -> Optional[set[str]]:
+    """Invalidation tags for a response built from these tool calls (None: don't cache)."""
+    tags: set[str] = set()
+    for name, args in tool_calls:
+        call_tags = tool_tags(name, args)
+        if call_tags is None:
+            return None
+        tags |= call_tags
+    return tags
+
+
+async def _record_turn(graph, config: dict, graph_input: dict, response: str) -> None:
+    """Store a turn answered without the model in the thread, so follow-up
+    questions keep their context."""
+    await graph.aupdate_state(
+        config,
+        {"messages": graph_input["messages"] + [AIMessage(content=response)]},
+        as_node="agent",
+    )
+
+
+async def _stop_runaway_run(graph, config: dict) -> str:
+    """Close a run cut off by the recursion limit so its thread stays usable.
+
+    Tool calls left without results would make the next model call fail, so
+    they are answered with a note before the apology is stored.
+    """
+    state = await graph.aget_state(config)
+    messages = state.values.get("messages", [])
+    closing: list[BaseMessage] = []
+    if messages and isinstance(messages[-1], AIMessage):
+        closing += [
+            ToolMessage(
+                content="Not run: the step limit for this request was reached.",
+                tool_call_id=call["id"],
+                name=call["name"],
+            )
+            for call in messages[-1].tool_calls
+        ]
+    closing.append(AIMessage(content=BUDGET_EXHAUSTED_REPLY))
+    await graph.aupdate_state(config, {"messages": closing}, as_node="agent")
+    return BUDGET_EXHAUSTED_REPLY
+
+
+async def _run_intent(intent: Intent, config: dict) -> str:
+    """Answer a fast-path command by calling its tool directly."""
+    tools = {tool.name: tool for tool in get_agent_tools()}
+    output = await tools[intent.tool].ainvoke(intent.args, config=config)
+    return render_tool_output(intent.tool, output)
 
 
 async def run_agent(
-    db: AsyncSession,
     user: Optional[User],
     message: str,
+    thread_id: Optional[str] = None,
     conversation_history: list[dict] = None,
-) -> tuple[str, list[dict]]:
+) -> tuple[str, str]:
     """
     Run the agent with a user message.
     
     Args:
-        db: Database session
         user: Current user (or None if not authenticated)
         message: User's message
-        conversation_history: Previous messages in the conversation
+        thread_id: Conversation thread to continue (a new one is started if None)
+        conversation_history: Client-side history, only used to seed a new thread
         
     Returns:
-        Tuple of (agent response, updated conversation history)
+        Tuple of (agent response, thread id)
     """
-    # Create the agent graph
-    graph = create_agent_graph(db, user)
-    
-    # Build messages from history
-    messages: list[BaseMessage] = []
-    
-    if conversation_history:
-        for msg in conversation_history:
-            if msg["role"] == "user":
-                messages.append(HumanMessage(content=msg["content"]))
-            elif msg["role"] == "assistant":
-                messages.append(AIMessage(content=msg["content"]))
-    
-    # Add the new user message
-    messages.append(HumanMessage(content=message))
-    
+    # Reuse the compiled agent graph
+    graph = get_agent_graph()
+
+    cacheable = _is_opening_anonymous_turn(user, thread_id, conversation_history)
+    graph_input, thread_id = _run_input(message, thread_id, conversation_history)
+    stats = RunStats()
+    config = _run_config(user, thread_id, stats)
+
+    intent = match_intent(message)
+    if intent is not None:
+        agent_metrics.increment(f"fast_path.{intent.tool}")
+        stats.path = "fast_path"
+        response = await _run_intent(intent, config)
+        await _record_turn(graph, config, graph_input, response)
+        stats.report(thread_id)
+        return response, thread_id
+
+    if cacheable:
+        cached = await agent_cache.get_response(message)
+        if cached is not None:
+            agent_metrics.increment("response_cache.hits")
+            stats.path = "cache"
+            await _record_turn(graph, config, graph_input, cached)
+            stats.report(thread_id)
+            return cached, thread_id
+
     # Run the agent
-    result = await graph.ainvoke({"messages": messages})
+    agent_metrics.increment("agent.runs")
+    cache_generation = agent_cache.responses.generation()
+    try:
+        result = await graph.ainvoke(graph_input, config=config)
+    except GraphRecursionError:
+        stats.budget_exhausted = True
+        response = await _stop_runaway_run(graph, config)
+        stats.report(thread_id)
+        return response, thread_id
+    except Exception as e:
+        stats.report(thread_id, error=repr(e))
+        raise
     
     # Extract the final response
     final_messages = result["messages"]
@@ -177,13 +349,106 @@ async def run_agent(
     response_content = ""
     for msg in reversed(final_messages):
         if isinstance(msg, AIMessage) and msg.content:
-            response_content = msg.content
+            response_content = content_text(msg.content)
             break
-    
-    # Update conversation history
-    new_history = conversation_history.copy() if conversation_history else []
-    new_history.append({"role": "user", "content": message})
-    new_history.append({"role": "assistant", "content": response_content})
-    
-    return response_content, new_history
 
+    if cacheable and response_content:
+        tags = _cache_tags([
+            (call["name"], call["args"])
+            for msg in final_messages if isinstance(msg, AIMessage)
+            for call in msg.tool_calls
+        ])
+        if tags is not None:
+            await agent_cache.put_response(message, response_content, tags, cache_generation)
+
+    stats.report(thread_id)
+    return response_content, thread_id
+
+
+async def stream_agent(
+    user: Optional[User],
+    message: str,
+    thread_id: Optional[str] = None,
+    conversation_history: list[dict] = None,
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Run the agent and yield (event, data) pairs as work happens.
+
+    Events:
+        token: {"content"} - text chunk from the model
+        tool_start: {"name", "input"} - a tool call began
+        tool_end: {"name"} - a tool call finished
+        done: {"response", "thread_id"} - final answer
+    """
+    graph = get_agent_graph()
+
+    cacheable = _is_opening_anonymous_turn(user, thread_id, conversation_history)
+    graph_input, thread_id = _run_input(message, thread_id, conversation_history)
+    stats = RunStats()
+    config = _run_config(user, thread_id, stats)
+
+    intent = match_intent(message)
+    if intent is not None:
+        agent_metrics.increment(f"fast_path.{intent.tool}")
+        stats.path = "fast_path"
+        yield "tool_start", {"name": intent.tool, "input": intent.args}
+        response = await _run_intent(intent, config)
+        yield "tool_end", {"name": intent.tool}
+        await _record_turn(graph, config, graph_input, response)
+        stats.report(thread_id)
+        yield "token", {"content": response}
+        yield "done", {"response": response, "thread_id": thread_id}
+        return
+
+    if cacheable:
+        cached = await agent_cache.get_response(message)
+        if cached is not None:
+            agent_metrics.increment("response_cache.hits")
+            stats.path = "cache"
+            await _record_turn(graph, config, graph_input, cached)
+            stats.report(thread_id)
+            yield "token", {"content": cached}
+            yield "done", {"response": cached, "thread_id": thread_id}
+            return
+
+    agent_metrics.increment("agent.runs")
+    cache_generation = agent_cache.responses.generation()
+    response_content = ""
+    tool_calls: list[tuple[str, dict]] = []
+    try:
+        async for event in graph.astream_events(graph_input, config=config, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") == "agent":
+                text = content_text(event["data"]["chunk"].content)
+                if text:
+                    yield "token", {"content": text}
+            elif kind == "on_chat_model_end" and event["metadata"].get("langgraph_node") == "agent":
+                output = event["data"]["output"]
+                if not getattr(output, "tool_calls", None):
+                    response_content = content_text(output.content) or response_content
+            elif kind == "on_tool_start":
+                tool_input = {
+                    key: value for key, value in event["data"].get("input", {}).items()
+                    if key != "config"
+                }
+                tool_calls.append((event["name"], tool_input))
+                yield "tool_start", {"name": event["name"], "input": tool_input}
+            elif kind == "on_tool_end":
+                yield "tool_end", {"name": event["name"]}
+    except GraphRecursionError:
+        stats.budget_exhausted = True
+        response = await _stop_runaway_run(graph, config)
+        stats.report(thread_id)
+        yield "done", {"response": response, "thread_id": thread_id}
+        return
+    except Exception as e:
+        stats.report(thread_id, error=repr(e))
+        raise
+
+    if cacheable and response_content:
+        tags = _cache_tags(tool_calls)
+        if tags is not None:
+            await agent_cache.put_response(message, response_content, tags, cache_generation)
+
+    stats.report(thread_id)
+    yield "done", {"response": response_content, "thread_id": thread_id}
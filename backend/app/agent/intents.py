@@ -0,0 +1,69 @@
+"""
+Rule-based fast path for simple assistant commands.
+
+Messages such as "show my bookings" or "is space 3 free tomorrow" map to
+exactly one read-only tool call. They are answered by calling the tool
+directly, without a Bedrock round trip; anything that doesn't match a rule
+in full goes to the LangGraph agent. Booking actions (create, cancel) always
+go to the agent, which confirms them with the user first.
+"""
+import re
+from datetime import date, timedelta
+from typing import NamedTuple, Optional
+
+
+class Intent(NamedTuple):
+    tool: str
+    args: dict
+
+
+# Politeness around a command doesn't change it
+_PREFIX = r"(?:(?:hi|hey|please|pls|can you|could you|would you)\s+)*"
+_SUFFIX = r"(?:\s+(?:please|pls|thanks|thank you))?"
+
+_DATE = r"(today|tomorrow|the day after tomorrow|day after tomorrow|(?:on\s+)?\d{4}-\d{2}-\d{2})"
+
+_MY_BOOKINGS = re.compile(
+    rf"{_PREFIX}(?:(?:show|list|view|see|get|give)\s+(?:me\s+)?|what are\s+)?"
+    rf"my\s+(?:(upcoming|future|all)\s+)?bookings{_SUFFIX}"
+)
+_IS_FREE = re.compile(
+    rf"{_PREFIX}is\s+space\s+(?:#|id\s+)?(\d+)\s+(?:free|available)\s+{_DATE}{_SUFFIX}"
+)
+_AVAILABILITY = re.compile(
+    rf"{_PREFIX}(?:check\s+)?availability\s+(?:of|for)\s+space\s+(?:#|id\s+)?(\d+)\s+{_DATE}{_SUFFIX}"
+)
+
+
+def _normalize(message: str) -> str:
+    return " ".join(message.lower().split()).rstrip(" ?.!")
+
+
+def _resolve_date(text: str, today: date) -> str:
+    text = text.removeprefix("on").strip()
+    if text == "today":
+        return today.isoformat()
+    if text == "tomorrow":
+        return (today + timedelta(days=1)).isoformat()
+    if text.endswith("day after tomorrow"):
+        return (today + timedelta(days=2)).isoformat()
+    return text
+
+
+def match_intent(message: str, today: Optional[date] = None) -> Optional[Intent]:
+    """The single tool call a message asks for, or None to use the agent."""
+    text = _normalize(message)
+    today = today or date.today()
+
+    match = _MY_BOOKINGS.fullmatch(text)
+    if match:
+        return Intent("get_user_bookings", {"upcoming_only": match.group(1) != "all"})
+
+    match = _IS_FREE.fullmatch(text) or _AVAILABILITY.fullmatch(text)
+    if match:
+        return Intent(
+            "check_availability",
+            {"space_id": int(match.group(1)), "check_date": _resolve_date(match.group(2), today)},
+        )
+
+    return None
@@ -0,0 +1,147 @@
+"""
+Chat model providers for the booking assistant, selected with AGENT_LLM_PROVIDER:
+- bedrock: Amazon Bedrock through the Converse API (default)
+- scripted: deterministic local stand-in that needs no AWS access, for
+  load tests and benchmarks of the graph, tools and database
+"""
+import asyncio
+import os
+import re
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.agent.intents import match_intent
+from app.agent.memory import content_text
+from app.agent.render import render_tool_output
+from app.core.config import settings
+
+LLM_PROVIDERS = ("bedrock", "scripted")
+
+_SPACE_TYPES = {
+    "hot desk": "hot_desk",
+    "desk": "hot_desk",
+    "private office": "private_office",
+    "office": "private_office",
+    "meeting room": "meeting_room",
+    "event space": "event_space",
+    "phone booth": "phone_booth",
+}
+_LOCATIONS = ("KL Eco City", "Bangsar South")
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic chat model that plays the agent's part without a provider.
+
+    With tools bound it answers a new user message with one tool call (the
+    fast-path intent if there is one, otherwise search_spaces with filters
+    picked out of the message), then renders the tool result as the final
+    reply. Without tools (conversation summaries) it replies with a short
+    text. Every call waits `latency_ms` to stand in for the provider round trip.
+    """
+
+    latency_ms: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _reply(self, messages: list[BaseMessage], tools: Optional[list[dict]]) -> AIMessage:
+        last = messages[-1]
+        tool_names = {tool["function"]["name"] for tool in tools or []}
+
+        if isinstance(last, HumanMessage) and tool_names:
+            name, args = self._plan(content_text(last.content))
+            if name in tool_names:
+                return AIMessage(
+                    content="",
+                    tool_calls=[{"name": name, "args": args, "id": f"call_{len(messages)}"}],
+                )
+
+        if isinstance(last, ToolMessage):
+            text = f"Here is what I found:\n\n{render_tool_output(last.name, content_text(last.content))}"
+        else:
+            text = f"Summary: {len(messages) - 1} earlier messages about finding and booking spaces."
+        return AIMessage(content=text)
+
+    @staticmethod
+    def _plan(message: str) -> tuple[str, dict]:
+        intent = match_intent(message)
+        if intent is not None:
+            return intent.tool, intent.args
+
+        text = message.lower()
+        args: dict[str, Any] = {}
+        for phrase, space_type in _SPACE_TYPES.items():
+            if phrase in text:
+                args["space_type"] = space_type
+                break
+        for location in _LOCATIONS:
+            if location.lower() in text:
+                args["location"] = location
+                break
+        price = re.search(r"(?:under|below|max)\s+rm\s*(\d+)", text)
+        if price:
+            args["max_price_per_hour"] = float(price.group(1))
+        people = re.search(r"(\d+)\s+(?:people|persons|pax)", text)
+        if people:
+            args["min_capacity"] = int(people.group(1))
+        return "search_spaces", args
+
+    def _result(self, messages: list[BaseMessage], tools: Optional[list[dict]]) -> ChatResult:
+        message = self._reply(messages, tools)
+        prompt_tokens = sum(_estimate_tokens(content_text(m.content)) for m in messages)
+        completion_tokens = _estimate_tokens(content_text(message.content) or str(message.tool_calls))
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_ms / 1000)
+        return self._result(messages, tools)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._result(messages, tools)
+
+
+def create_chat_model() -> BaseChatModel:
+    """Chat model of the configured provider."""
+    provider = settings.agent_llm_provider
+
+    if provider == "scripted":
+        return ScriptedChatModel(latency_ms=settings.agent_scripted_latency_ms)
+
+    if provider == "bedrock":
+        from langchain_aws import ChatBedrockConverse
+
+        # Get the Bedrock model ARN from environment or use default
+        model_id = os.getenv(
+            "BEDROCK_MODEL_ID",
+            "amazon.nova-pro-v1:0"
+        )
+        region = os.getenv("AWS_REGION", "us-east-1")
+
+        # Initialize Bedrock chat model using Converse API (supports Nova, Claude, and other models)
+        return ChatBedrockConverse(
+            model=model_id,
+            region_name=region,
+            max_tokens=1024,
+            temperature=0.7,
+        )
+
+    raise ValueError(f"Unknown AGENT_LLM_PROVIDER: {provider!r} (expected one of {LLM_PROVIDERS})")
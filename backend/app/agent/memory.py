@@ -0,0 +1,175 @@
+"""
+Server-side conversation memory for the booking assistant.
+
+Conversations are LangGraph threads persisted by a checkpointer selected
+with AGENT_CHECKPOINTER:
+- memory: in-process only (single worker, lost on restart); threads idle
+  for AGENT_MEMORY_THREAD_TTL_SECONDS, or beyond the AGENT_MEMORY_MAX_THREADS
+  most recently used, are forgotten
+- sqlite: file at AGENT_CHECKPOINT_URL
+- postgres: DSN at AGENT_CHECKPOINT_URL, defaulting to DATABASE_URL
+
+Once a thread grows past AGENT_HISTORY_WINDOW messages, all but the newest
+half window are folded into a running summary, so prompt size stays bounded
+however long a thread gets and the summary call only runs every few turns.
+"""
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, SystemMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.core.config import settings
+from app.core.database import SCHEMA_LOCK_KEY
+
+SUMMARY_PROMPT = """Summarize the conversation below between a user and the Infinity8 booking assistant.
+Keep facts needed later: spaces, dates, times, booking IDs, prices, and the user's preferences.
+Be concise and write in plain sentences."""
+
+
+class BoundedMemorySaver(MemorySaver):
+    """MemorySaver that forgets idle and least recently used threads.
+
+    Every anonymous conversation opens a new thread, so an unbounded
+    in-process store would grow for the life of the worker.
+    """
+
+    def __init__(self, max_threads: int, ttl_seconds: int):
+        super().__init__()
+        self._max_threads = max_threads
+        self._ttl_seconds = ttl_seconds
+        self._last_used: OrderedDict[str, float] = OrderedDict()
+
+    def _touch(self, config: dict) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        self._last_used[thread_id] = time.monotonic()
+        self._last_used.move_to_end(thread_id)
+
+        expires_before = time.monotonic() - self._ttl_seconds
+        while len(self._last_used) > 1:
+            oldest, last_used = next(iter(self._last_used.items()))
+            if len(self._last_used) <= self._max_threads and last_used >= expires_before:
+                break
+            del self._last_used[oldest]
+            self.delete_thread(oldest)
+
+    # The async methods delegate to these
+    def get_tuple(self, config):
+        checkpoint = super().get_tuple(config)
+        if checkpoint is not None:
+            self._touch(config)
+        return checkpoint
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._touch(config)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        self._touch(config)
+        return super().put_writes(config, writes, task_id, task_path)
+
+
+@asynccontextmanager
+async def open_checkpointer() -> AsyncIterator[BaseCheckpointSaver]:
+    """Open the configured checkpointer for the lifetime of the app."""
+    kind = settings.agent_checkpointer
+
+    if kind == "memory":
+        # Each worker would hold its own threads, and follow-up turns that
+        # land on another worker would start from scratch
+        if int(os.getenv("UVICORN_WORKERS", "1")) > 1:
+            raise RuntimeError(
+                "AGENT_CHECKPOINTER=memory can't be shared between worker processes; "
+                "set AGENT_CHECKPOINTER=postgres (or sqlite) when UVICORN_WORKERS > 1"
+            )
+        yield BoundedMemorySaver(
+            settings.agent_memory_max_threads, settings.agent_memory_thread_ttl_seconds
+        )
+
+    elif kind == "sqlite":
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        async with AsyncSqliteSaver.from_conn_string(
+            settings.agent_checkpoint_url or "agent_checkpoints.sqlite"
+        ) as saver:
+            await saver.setup()
+            yield saver
+
+    elif kind == "postgres":
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+        # psycopg wants a plain libpq URL, not the SQLAlchemy driver form
+        url = settings.agent_checkpoint_url or settings.database_url.replace(
+            "postgresql+asyncpg://", "postgresql://"
+        )
+        async with AsyncPostgresSaver.from_conn_string(url) as saver:
+            # Workers starting together would race on the checkpoint tables'
+            # migrations; take turns (the connection is in autocommit mode)
+            await saver.conn.execute("SELECT pg_advisory_lock(%s)", (SCHEMA_LOCK_KEY,))
+            try:
+                await saver.setup()
+            finally:
+                await saver.conn.execute("SELECT pg_advisory_unlock(%s)", (SCHEMA_LOCK_KEY,))
+            yield saver
+
+    else:
+        raise ValueError(f"Unknown AGENT_CHECKPOINTER: {kind!r}")
+
+
+def content_text(content) -> str:
+    """Text of a message or chunk; Converse returns content blocks as a list."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
+def thread_key(thread_id: str, user_id: Optional[int]) -> str:
+    """Namespace threads per user so a leaked thread_id can't be read by others."""
+    return f"{user_id if user_id is not None else 'anon'}:{thread_id}"
+
+
+def split_for_summary(messages: list[BaseMessage], window: int) -> int:
+    """Index of the first message to keep verbatim (0 if nothing to fold).
+
+    Nothing is folded until the thread exceeds `window`; then only about
+    half a window is kept, so the next summary is several turns away. The
+    cut always lands on a HumanMessage so a tool call is never separated
+    from its results.
+    """
+    if len(messages) <= window:
+        return 0
+    keep_from = len(messages) - max(window // 2, 1)
+    # Earliest turn start in the newest half window...
+    for index in range(keep_from, len(messages)):
+        if isinstance(messages[index], HumanMessage):
+            return index
+    # ...or, if one long turn fills it, the latest start within the window
+    for index in range(keep_from - 1, max(len(messages) - window, 0) - 1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return index
+    return 0
+
+
+async def summarize_messages(llm, summary: str, messages: list[BaseMessage]) -> dict:
+    """State update folding `messages` into the running summary."""
+    transcript = "\n".join(
+        f"{message.type}: {content_text(message.content)}" for message in messages
+    )
+    if summary:
+        transcript = f"Summary so far:\n{summary}\n\nNewer messages:\n{transcript}"
+
+    response = await llm.ainvoke([
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(content=transcript),
+    ])
+    return {
+        "summary": content_text(response.content),
+        "messages": [RemoveMessage(id=message.id) for message in messages],
+    }
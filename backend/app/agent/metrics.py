@@ -0,0 +1,202 @@
+"""
+In-process metrics for the booking assistant (per worker, reset on restart).
+
+`agent_metrics` aggregates counters and distributions (latencies in ms,
+iterations, tokens). `RunStats` is a callback handler attached to a single
+graph run; it times the graph nodes, model calls and tools, reads token
+usage from the model's usage metadata, and reports the run to
+`agent_metrics` and the `app.agent` logger as one JSON line.
+"""
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.agent")
+
+
+class Distribution:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": round(self.total, 3),
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+        }
+
+
+class AgentMetrics:
+    def __init__(self):
+        self._counters: Counter[str] = Counter()
+        self._distributions: dict[str, Distribution] = defaultdict(Distribution)
+        self._started_at = time.time()
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        self._counters[name] += amount
+
+    def observe(self, name: str, value: float) -> None:
+        self._distributions[name].add(value)
+
+    def snapshot(self) -> dict:
+        return {
+            "uptime_seconds": round(time.time() - self._started_at, 1),
+            "counters": {
+                name: round(value, 6) if isinstance(value, float) else value
+                for name, value in sorted(self._counters.items())
+            },
+            "distributions": {
+                name: distribution.as_dict()
+                for name, distribution in sorted(self._distributions.items())
+            },
+        }
+
+    def reset(self) -> None:
+        self._counters.clear()
+        self._distributions.clear()
+        self._started_at = time.time()
+
+
+agent_metrics = AgentMetrics()
+
+
+def estimated_cost(input_tokens: int, output_tokens: int) -> float:
+    """Model spend in USD at the configured per-1k-token prices."""
+    return (
+        input_tokens * settings.agent_input_token_cost_per_1k
+        + output_tokens * settings.agent_output_token_cost_per_1k
+    ) / 1000
+
+
+class RunStats(BaseCallbackHandler):
+    """Timings and token usage of one graph run; pass in config["callbacks"]."""
+
+    # Bookkeeping only, so run in the event loop rather than a thread pool
+    run_inline = True
+
+    def __init__(self, path: str = "agent"):
+        self.path = path
+        self.started_at = time.perf_counter()
+        self.iterations = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.node_ms: dict[str, float] = defaultdict(float)
+        self.model_ms = 0.0
+        self.tool_ms: list[tuple[str, float]] = []
+        self.budget_exhausted = False
+        self._open: dict[UUID, tuple[str, str, float]] = {}
+
+    def _start(self, run_id: UUID, kind: str, name: str) -> None:
+        self._open[run_id] = (kind, name, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> None:
+        started = self._open.pop(run_id, None)
+        if started is None:
+            return
+        kind, name, started_at = started
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+        if kind == "node":
+            self.node_ms[name] += elapsed_ms
+        elif kind == "model":
+            self.model_ms += elapsed_ms
+        else:
+            self.tool_ms.append((name, elapsed_ms))
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, name=None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # Graph nodes run as chains named after the node; skip their inner
+        # chains and LangGraph's own __start__ step
+        if node is not None and name == node and not node.startswith("__"):
+            self._start(run_id, "node", node)
+            if node == "agent":
+                self.iterations += 1
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs: Any) -> None:
+        self._start(run_id, "model", "model")
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.input_tokens += usage.get("input_tokens", 0)
+                    self.output_tokens += usage.get("output_tokens", 0)
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, name=None, **kwargs: Any) -> None:
+        self._start(run_id, "tool", name or (serialized or {}).get("name", "tool"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def report(self, thread_id: str, error: Optional[str] = None) -> dict:
+        """Record the finished run in agent_metrics and log it."""
+        total_ms = (time.perf_counter() - self.started_at) * 1000
+        cost = estimated_cost(self.input_tokens, self.output_tokens)
+
+        agent_metrics.observe(f"run_ms.{self.path}", total_ms)
+        agent_metrics.observe("run.iterations", self.iterations)
+        agent_metrics.observe("run.input_tokens", self.input_tokens)
+        agent_metrics.observe("run.output_tokens", self.output_tokens)
+        if self.model_ms:
+            agent_metrics.observe("model_ms", self.model_ms)
+        for node, elapsed_ms in self.node_ms.items():
+            agent_metrics.observe(f"node_ms.{node}", elapsed_ms)
+        for tool, elapsed_ms in self.tool_ms:
+            agent_metrics.observe(f"tool_ms.{tool}", elapsed_ms)
+        agent_metrics.increment("tokens.input", self.input_tokens)
+        agent_metrics.increment("tokens.output", self.output_tokens)
+        agent_metrics.increment("cost_usd", cost)
+        if self.budget_exhausted:
+            agent_metrics.increment("agent.budget_exhausted")
+        if error:
+            agent_metrics.increment("agent.errors")
+
+        record = {
+            "event": "agent_run",
+            "thread_id": thread_id,
+            "path": self.path,
+            "total_ms": round(total_ms, 1),
+            "model_ms": round(self.model_ms, 1),
+            "node_ms": {node: round(ms, 1) for node, ms in self.node_ms.items()},
+            "tool_ms": [[tool, round(ms, 1)] for tool, ms in self.tool_ms],
+            "iterations": self.iterations,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(cost, 6),
+            "budget_exhausted": self.budget_exhausted,
+            "error": error,
+        }
+        if self.budget_exhausted or error:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+        return record
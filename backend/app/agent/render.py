@@ -0,0 +1,97 @@
+"""
+Markdown rendering of tool results for users.
+
+Tools return compact JSON for the model. When a result goes straight to the
+user (fast-path commands), it is rendered here instead.
+"""
+import json
+
+
+def _rows(payload: dict) -> list[dict]:
+    return [dict(zip(payload["columns"], row)) for row in payload["rows"]]
+
+
+def _plural(count: int, word: str, plural: str = None) -> str:
+    return f"{count} {word if count == 1 else plural or word + 's'}"
+
+
+def render_spaces(payload: dict) -> str:
+    spaces = _rows(payload)
+    lines = [f"Found {_plural(len(spaces), 'space')}{' (showing the cheapest)' if payload.get('truncated') else ''}:", ""]
+    for space in spaces:
+        location = space["location"] + (f", {space['floor']}" if space["floor"] else "")
+        price = f"RM{space['price_per_hour']:.2f}/hour"
+        if space["price_per_day"]:
+            price += f", RM{space['price_per_day']:.2f}/day"
+        lines += [
+            f"- **{space['name']}** (ID: {space['id']})",
+            f"  Type: {space['type'].replace('_', ' ').title()}",
+            f"  Location: {location}",
+            f"  Capacity: {_plural(space['capacity'], 'person', 'people')}",
+            f"  Price: {price}",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def render_availability(payload: dict) -> str:
+    lines = [f"Availability for **{payload['space']}** on {payload['date']}:", ""]
+    if payload["free"]:
+        lines.append("Available:")
+        lines += [f"  - {start} - {end}" for start, end in payload["free"]]
+    else:
+        lines.append("No available slots on this date.")
+    lines += ["", f"Price: RM{payload['price_per_hour']:.2f}/hour"]
+    return "\n".join(lines)
+
+
+def render_booking(payload: dict) -> str:
+    return "\n".join([
+        "Booking confirmed!",
+        "",
+        "**Booking Details:**",
+        f"- Booking ID: #{payload['booking_id']}",
+        f"- Space: {payload['space']}",
+        f"- Location: {payload['location']}",
+        f"- Date: {payload['date']}",
+        f"- Time: {payload['start']} - {payload['end']} ({_plural(payload['hours'], 'hour')})",
+        f"- Total: RM{payload['total']:.2f}",
+        "",
+        "You can view this booking in your 'My Bookings' page.",
+    ])
+
+
+def render_bookings(payload: dict) -> str:
+    lines = ["Your bookings:", ""]
+    for booking in _rows(payload):
+        lines += [
+            f"- **Booking #{booking['id']}** - {booking['status'].title()}",
+            f"  Space: {booking['space']}",
+            f"  Date: {booking['date']}",
+            f"  Time: {booking['start']} - {booking['end']}",
+            f"  Total: RM{booking['total']:.2f}",
+            "",
+        ]
+    if payload.get("next_offset") is not None:
+        lines.append("Ask to see more bookings.")
+    return "\n".join(lines)
+
+
+_RENDERERS = {
+    "search_spaces": render_spaces,
+    "check_availability": render_availability,
+    "create_booking": render_booking,
+    "get_user_bookings": render_bookings,
+}
+
+
+def render_tool_output(tool: str, output: str) -> str:
+    """User-facing text for a tool result (errors and notices are already plain text)."""
+    renderer = _RENDERERS.get(tool)
+    if renderer is None:
+        return output
+    try:
+        payload = json.loads(output)
+    except ValueError:
+        return output
+    return renderer(payload)
@@ -2,339 +2,534 @@
 Agent tools for the room booking assistant.
 These tools allow the AI to interact with the booking system.
 """
+import asyncio
+import json
 from datetime import datetime, date
-from typing import Optional, List
+from decimal import Decimal
+from typing import Awaitable, Callable, Optional, List
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from sqlalchemy import select, and_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.agent.cache import agent_cache, tool_tags
+from app.core.database import async_session_maker, read_session_maker
 from app.models.space import Space
 from app.models.booking import Booking, BookingStatus
 from app.models.user import User
+from app.services.availability import DayGrid
+from app.services.booking_index import booking_index, is_overlap_violation
+# Module import: invalidation imports the agent cache, and with it this package
+from app.services import invalidation
+from app.services.rollups import apply_booking_change, booking_state
 
 
-def get_agent_tools(db: AsyncSession, user: Optional[User] = None):
-    """Create tools with database session and user context injected."""
-
-    @tool
-    async def search_spaces(
-        space_type: Optional[str] = None,
-        location: Optional[str] = None,
-        min_capacity: Optional[int] = None,
-        max_price_per_hour: Optional[float] = None,
-    ) -> str:
-        """
-        Search for available coworking spaces.
+# Tool results go back into the model's context, so they are compact JSON
+# with only the columns the assistant needs, and bounded in size
+SEARCH_RESULT_LIMIT = 20
+BOOKINGS_PAGE_SIZE = 10
+
+SPACE_COLUMNS = (
+    Space.id,
+    Space.name,
+    Space.type,
+    Space.location,
+    Space.floor,
+    Space.capacity,
+    Space.price_per_hour,
+    Space.price_per_day,
+)
+BOOKING_COLUMNS = (
+    Booking.id,
+    Booking.status,
+    Space.name,
+    Booking.start_time,
+    Booking.end_time,
+    Booking.total_price,
+)
+
+
+def _payload(**fields) -> str:
+    return json.dumps(fields, separators=(",", ":"), default=_json_default)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class RunMemo:
+    """Tool results and Space rows shared by the tool calls of one agent run.
+
+    A run often repeats the same read (check_availability twice, or
+    check_availability then create_booking for one space). Read results are
+    dropped after a booking is created or cancelled; Space rows are kept,
+    since booking tools never change them. Once the run has written, its
+    reads go to the primary so they see the write even if the replica lags.
+    """
+
+    def __init__(self):
+        self.results: dict[str, asyncio.Future] = {}
+        self.wrote = False
+        self._spaces: dict[int, Optional[Space]] = {}
+
+    async def space(self, db: AsyncSession, space_id: int) -> Optional[Space]:
+        if space_id not in self._spaces:
+            result = await db.execute(select(Space).where(Space.id == space_id))
+            self._spaces[space_id] = result.scalar_one_or_none()
+        return self._spaces[space_id]
+
+    def after_write(self) -> None:
+        self.wrote = True
+        self.results.clear()
+
+
+def _user(config: RunnableConfig) -> Optional[User]:
+    """Current user passed through the graph config (None if anonymous)."""
+    return config.get("configurable", {}).get("user")
+
+
+def _session(config: RunnableConfig, read: bool = False) -> AsyncSession:
+    """A pooled session owned by a single tool call.
+
+    ToolNode runs the tool calls of one model step concurrently, and an
+    AsyncSession can't be shared between concurrent tasks. Read-only tools
+    pass `read=True` to use the replica.
+    """
+    configurable = config.get("configurable", {})
+    if read and not _memo(config).wrote:
+        return configurable.get("read_session_factory", read_session_maker)()
+    return configurable.get("session_factory", async_session_maker)()
+
+
+async def _in_session(config: RunnableConfig, func, *args) -> str:
+    async with _session(config) as db:
+        return await func(db, *args)
+
+
+async def _in_read_session(config: RunnableConfig, func, *args) -> str:
+    async with _session(config, read=True) as db:
+        return await func(db, *args)
+
+
+def _memo(config: RunnableConfig) -> RunMemo:
+    """This run's memo (a throwaway one when a tool is invoked on its own)."""
+    return config.get("configurable", {}).get("memo") or RunMemo()
+
+
+async def _memoized(
+    config: RunnableConfig,
+    name: str,
+    args: dict,
+    compute: Callable[[], Awaitable[str]],
+) -> str:
+    """Result of a read-only tool call: from this run's memo, the shared cache, or `compute`.
+
+    Identical calls issued in parallel by one model turn share a single lookup.
+    Tools whose results go into the shared cache compute them on the primary:
+    a lagging replica could refill it right after a booking invalidated it.
+    """
+    memo = _memo(config)
+    key = agent_cache.tool_key(name, args)
+
+    async def lookup() -> str:
+        tags = tool_tags(name, args)
+        result = agent_cache.tools.get(key) if tags is not None else None
+        if result is None:
+            # Not kept if a write invalidated its tags while it was computed
+            generation = agent_cache.tools.generation()
+            result = await compute()
+            if tags is not None:
+                agent_cache.tools.put(key, result, tags, generation)
+        return result
+
+    if key not in memo.results:
+        memo.results[key] = asyncio.ensure_future(lookup())
+    try:
+        return await memo.results[key]
+    except Exception:
+        memo.results.pop(key, None)
+        raise
+
+
+@tool
+async def search_spaces(
+    space_type: Optional[str] = None,
+    location: Optional[str] = None,
+    min_capacity: Optional[int] = None,
+    max_price_per_hour: Optional[float] = None,
+    *,
+    config: RunnableConfig,
+) -> str:
+    """
+    Search for available coworking spaces.
+    
+    Args:
+        space_type: Type of space - 'hot_desk', 'private_office', 'meeting_room', 'event_space', or 'phone_booth'
+        location: Location filter - 'KL Eco City' or 'Bangsar South'
+        min_capacity: Minimum number of people the space should accommodate
+        max_price_per_hour: Maximum price per hour in RM
         
-        Args:
-            space_type: Type of space - 'hot_desk', 'private_office', 'meeting_room', 'event_space', or 'phone_booth'
-            location: Location filter - 'KL Eco City' or 'Bangsar South'
-            min_capacity: Minimum number of people the space should accommodate
-            max_price_per_hour: Maximum price per hour in RM
-            
-        Returns:
-            List of matching spaces with their details
-        """
-        query = select(Space).where(Space.is_active == True)
-
-        if space_type:
-            query = query.where(Space.type == space_type)
-        if location:
-            query = query.where(Space.location.ilike(f"%{location}%"))
-        if min_capacity:
-            query = query.where(Space.capacity >= min_capacity)
-        if max_price_per_hour:
-            query = query.where(Space.price_per_hour <= max_price_per_hour)
-
-        result = await db.execute(query.order_by(Space.price_per_hour))
-        spaces = result.scalars().all()
-
-        if not spaces:
-            return "No spaces found matching your criteria. Try adjusting your filters."
-
-        response = f"Found {len(spaces)} space(s):\n\n"
-        for space in spaces:
-            response += f"- **{space.name}** (ID: {space.id})\n"
-            response += f"  Type: {space.type.replace('_', ' ').title()}\n"
-            response += f"  Location: {space.location}"
-            if space.floor:
-                response += f", {space.floor}"
-            response += f"\n  Capacity: {space.capacity} {'person' if space.capacity == 1 else 'people'}\n"
-            response += f"  Price: RM{space.price_per_hour}/hour"
-            if space.price_per_day:
-                response += f", RM{space.price_per_day}/day"
-            response += "\n\n"
-
-        return response
-
-    @tool
-    async def check_availability(
-        space_id: int,
-        check_date: str,
-    ) -> str:
-        """
-        Check availability of a specific space on a given date.
+    Returns:
+        JSON table of matching spaces (cheapest first, at most 20; narrow the
+        filters if "truncated" is true)
+    """
+    return await _memoized(
+        config,
+        "search_spaces",
+        {
+            "space_type": space_type,
+            "location": location,
+            "min_capacity": min_capacity,
+            "max_price_per_hour": max_price_per_hour,
+        },
+        lambda: _in_session(config, _search_spaces, space_type, location, min_capacity, max_price_per_hour),
+    )
+
+
+async def _search_spaces(
+    db: AsyncSession,
+    space_type: Optional[str],
+    location: Optional[str],
+    min_capacity: Optional[int],
+    max_price_per_hour: Optional[float],
+) -> str:
+    query = select(*SPACE_COLUMNS).where(Space.is_active == True)
+
+    if space_type:
+        query = query.where(Space.type == space_type)
+    if location:
+        query = query.where(Space.location.ilike(f"%{location}%"))
+    if min_capacity:
+        query = query.where(Space.capacity >= min_capacity)
+    if max_price_per_hour:
+        query = query.where(Space.price_per_hour <= max_price_per_hour)
+
+    # One extra row tells us whether the list was cut off
+    result = await db.execute(
+        query.order_by(Space.price_per_hour, Space.id).limit(SEARCH_RESULT_LIMIT + 1)
+    )
+    rows = result.all()
+
+    if not rows:
+        return "No spaces found matching your criteria. Try adjusting your filters."
+
+    return _payload(
+        columns=[column.key for column in SPACE_COLUMNS],
+        rows=[list(row) for row in rows[:SEARCH_RESULT_LIMIT]],
+        truncated=len(rows) > SEARCH_RESULT_LIMIT,
+    )
+
+
+@tool
+async def check_availability(
+    space_id: int,
+    check_date: str,
+    *,
+    config: RunnableConfig,
+) -> str:
+    """
+    Check availability of a specific space on a given date.
+    
+    Args:
+        space_id: The ID of the space to check
+        check_date: Date to check in YYYY-MM-DD format
         
-        Args:
-            space_id: The ID of the space to check
-            check_date: Date to check in YYYY-MM-DD format
-            
-        Returns:
-            Available time slots for the space on that date
-        """
-        # Validate space exists
-        result = await db.execute(select(Space).where(Space.id == space_id))
-        space = result.scalar_one_or_none()
-
-        if not space:
-            return f"Space with ID {space_id} not found."
-
-        try:
-            target_date = datetime.strptime(check_date, "%Y-%m-%d").date()
-        except ValueError:
-            return "Invalid date format. Please use YYYY-MM-DD format."
-
-        if target_date < date.today():
-            return "Cannot check availability for past dates."
-
-        # Get existing bookings for this space on the date
-        start_of_day = datetime.combine(target_date, datetime.min.time())
-        end_of_day = datetime.combine(target_date, datetime.max.time())
-
-        result = await db.execute(
-            select(Booking).where(
-                and_(
-                    Booking.space_id == space_id,
-                    Booking.start_time >= start_of_day,
-                    Booking.end_time <= end_of_day,
-                    Booking.status.in_([BookingStatus.confirmed, BookingStatus.pending])
-                )
-            ).order_by(Booking.start_time)
+    Returns:
+        JSON with the free time ranges (HH:MM start/end) of the space on that date
+    """
+    return await _memoized(
+        config,
+        "check_availability",
+        {"space_id": space_id, "check_date": check_date},
+        lambda: _in_session(config, _check_availability, _memo(config), space_id, check_date),
+    )
+
+
+async def _check_availability(db: AsyncSession, memo: RunMemo, space_id: int, check_date: str) -> str:
+    # Validate space exists
+    space = await memo.space(db, space_id)
+
+    if not space:
+        return f"Space with ID {space_id} not found."
+
+    try:
+        target_date = datetime.strptime(check_date, "%Y-%m-%d").date()
+    except ValueError:
+        return "Invalid date format. Please use YYYY-MM-DD format."
+
+    if target_date < date.today():
+        return "Cannot check availability for past dates."
+
+    # Get existing bookings for this space overlapping the opening hours
+    grid = DayGrid(target_date)
+
+    result = await db.execute(
+        select(Booking.start_time, Booking.end_time).where(
+            and_(
+                Booking.space_id == space_id,
+                Booking.start_time < grid.closes_at,
+                Booking.end_time > grid.opens_at,
+                Booking.status.in_([BookingStatus.confirmed, BookingStatus.pending])
+            )
         )
-        bookings = result.scalars().all()
-
-        # Generate available slots (9 AM to 9 PM)
-        available_slots = []
-        booked_slots = []
-
-        for hour in range(9, 21):
-            slot_start = datetime.combine(target_date, datetime.min.time().replace(hour=hour))
-            slot_end = datetime.combine(target_date, datetime.min.time().replace(hour=hour + 1))
-
-            is_booked = False
-            for booking in bookings:
-                book_start = booking.start_time.replace(tzinfo=None)
-                book_end = booking.end_time.replace(tzinfo=None)
-                if not (slot_end <= book_start or slot_start >= book_end):
-                    is_booked = True
-                    break
-
-            slot_str = f"{hour:02d}:00 - {hour + 1:02d}:00"
-            if is_booked:
-                booked_slots.append(slot_str)
-            else:
-                available_slots.append(slot_str)
-
-        response = f"Availability for **{space.name}** on {check_date}:\n\n"
+    )
+    free_mask = grid.free_mask(result.all())
+
+    return _payload(
+        space_id=space.id,
+        space=space.name,
+        date=check_date,
+        price_per_hour=space.price_per_hour,
+        free=grid.free_ranges(free_mask),
+    )
+
+
+@tool
+async def create_booking(
+    space_id: int,
+    booking_date: str,
+    start_hour: int,
+    end_hour: int,
+    notes: Optional[str] = None,
+    *,
+    config: RunnableConfig,
+) -> str:
+    """
+    Create a booking for a space.
+    
+    Args:
+        space_id: The ID of the space to book
+        booking_date: Date of booking in YYYY-MM-DD format
+        start_hour: Start hour (24-hour format, e.g., 9 for 9 AM, 14 for 2 PM)
+        end_hour: End hour (24-hour format, must be after start_hour)
+        notes: Optional notes for the booking
         
-        if available_slots:
-            response += "Available slots:\n"
-            for slot in available_slots:
-                response += f"  - {slot}\n"
-        else:
-            response += "No available slots on this date.\n"
-
-        if booked_slots:
-            response += f"\nBooked slots: {', '.join(booked_slots)}"
-
-        response += f"\n\nPrice: RM{space.price_per_hour}/hour"
-
-        return response
-
-    @tool
-    async def create_booking(
-        space_id: int,
-        booking_date: str,
-        start_hour: int,
-        end_hour: int,
-        notes: Optional[str] = None,
-    ) -> str:
-        """
-        Create a booking for a space.
+    Returns:
+        JSON booking confirmation, or an error message
+    """
+    user = _user(config)
+
+    if not user:
+        return "You need to be logged in to create a booking. Please sign in first."
+
+    return await _in_session(
+        config, _create_booking, _memo(config), user, space_id, booking_date, start_hour, end_hour, notes
+    )
+
+
+async def _create_booking(
+    db: AsyncSession,
+    memo: RunMemo,
+    user: User,
+    space_id: int,
+    booking_date: str,
+    start_hour: int,
+    end_hour: int,
+    notes: Optional[str],
+) -> str:
+    # Validate space
+    space = await memo.space(db, space_id)
+
+    if not space:
+        return f"Space with ID {space_id} not found."
+
+    if not space.is_active:
+        return "This space is currently not available for booking."
+
+    # Validate date and time
+    try:
+        target_date = datetime.strptime(booking_date, "%Y-%m-%d").date()
+    except ValueError:
+        return "Invalid date format. Please use YYYY-MM-DD format."
+
+    if target_date < date.today():
+        return "Cannot book for past dates."
+
+    if start_hour < 9 or end_hour > 21 or start_hour >= end_hour:
+        return "Invalid time range. Hours must be between 9 (9 AM) and 21 (9 PM), and start must be before end."
+
+    start_time = datetime.combine(target_date, datetime.min.time().replace(hour=start_hour))
+    end_time = datetime.combine(target_date, datetime.min.time().replace(hour=end_hour))
+
+    # Check for conflicts
+    if await booking_index.has_conflict(db, space_id, start_time, end_time):
+        return "Sorry, this time slot is already booked. Please check availability and choose a different time."
+
+    # Calculate price
+    duration_hours = end_hour - start_hour
+    total_price = float(space.price_per_hour) * duration_hours
+
+    # Create booking
+    booking = Booking(
+        user_id=user.id,
+        space_id=space_id,
+        start_time=start_time,
+        end_time=end_time,
+        total_price=total_price,
+        notes=notes,
+        status=BookingStatus.confirmed,
+    )
+
+    db.add(booking)
+    try:
+        await db.flush()
+        await apply_booking_change(db, None, booking_state(booking))
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if not is_overlap_violation(exc):
+            raise
+        booking_index.invalidate(space_id)
+        agent_cache.invalidate_bookings(space_id)
+        memo.after_write()
+        return "Sorry, this time slot is already booked. Please check availability and choose a different time."
+    await db.refresh(booking)
+    booking_index.sync(booking)
+    await invalidation.bookings_changed(space_id)
+    memo.after_write()
+
+    return _payload(
+        confirmed=True,
+        booking_id=booking.id,
+        space=space.name,
+        location=space.location,
+        date=booking_date,
+        start=f"{start_hour:02d}:00",
+        end=f"{end_hour:02d}:00",
+        hours=duration_hours,
+        total=round(total_price, 2),
+    )
+
+
+@tool
+async def get_user_bookings(
+    upcoming_only: bool = True,
+    offset: int = 0,
+    *,
+    config: RunnableConfig,
+) -> str:
+    """
+    Get the current user's bookings.
+    
+    Args:
+        upcoming_only: If True, only show future bookings (soonest first). If False, show all bookings (most recent first).
+        offset: Number of bookings to skip; pass the previous result's next_offset to see more
         
-        Args:
-            space_id: The ID of the space to book
-            booking_date: Date of booking in YYYY-MM-DD format
-            start_hour: Start hour (24-hour format, e.g., 9 for 9 AM, 14 for 2 PM)
-            end_hour: End hour (24-hour format, must be after start_hour)
-            notes: Optional notes for the booking
-            
-        Returns:
-            Confirmation of the booking or error message
-        """
-        if not user:
-            return "You need to be logged in to create a booking. Please sign in first."
-
-        # Validate space
-        result = await db.execute(select(Space).where(Space.id == space_id))
-        space = result.scalar_one_or_none()
-
-        if not space:
-            return f"Space with ID {space_id} not found."
-
-        if not space.is_active:
-            return "This space is currently not available for booking."
-
-        # Validate date and time
-        try:
-            target_date = datetime.strptime(booking_date, "%Y-%m-%d").date()
-        except ValueError:
-            return "Invalid date format. Please use YYYY-MM-DD format."
-
-        if target_date < date.today():
-            return "Cannot book for past dates."
-
-        if start_hour < 9 or end_hour > 21 or start_hour >= end_hour:
-            return "Invalid time range. Hours must be between 9 (9 AM) and 21 (9 PM), and start must be before end."
-
-        start_time = datetime.combine(target_date, datetime.min.time().replace(hour=start_hour))
-        end_time = datetime.combine(target_date, datetime.min.time().replace(hour=end_hour))
-
-        # Check for conflicts
-        result = await db.execute(
-            select(Booking).where(
-                and_(
-                    Booking.space_id == space_id,
-                    Booking.status.in_([BookingStatus.confirmed, BookingStatus.pending]),
-                    Booking.start_time < end_time,
-                    Booking.end_time > start_time,
-                )
-            )
-        )
-        conflict = result.scalar_one_or_none()
-
-        if conflict:
-            return f"Sorry, this time slot is already booked. Please check availability and choose a different time."
-
-        # Calculate price
-        duration_hours = end_hour - start_hour
-        total_price = float(space.price_per_hour) * duration_hours
-
-        # Create booking
-        booking = Booking(
-            user_id=user.id,
-            space_id=space_id,
-            start_time=start_time,
-            end_time=end_time,
-            total_price=total_price,
-            notes=notes,
-            status=BookingStatus.confirmed,
-        )
+    Returns:
+        JSON table of at most 10 bookings, with next_offset set when there are more
+    """
+    user = _user(config)
+
+    if not user:
+        return "You need to be logged in to view your bookings. Please sign in first."
+
+    return await _memoized(
+        config,
+        "get_user_bookings",
+        {"user_id": user.id, "upcoming_only": upcoming_only, "offset": offset},
+        lambda: _in_read_session(config, _get_user_bookings, user, upcoming_only, max(offset, 0)),
+    )
+
+
+async def _get_user_bookings(db: AsyncSession, user: User, upcoming_only: bool, offset: int) -> str:
+    query = (
+        select(*BOOKING_COLUMNS)
+        .join(Space, Space.id == Booking.space_id)
+        .where(Booking.user_id == user.id)
+    )
+
+    if upcoming_only:
+        query = query.where(Booking.start_time >= datetime.utcnow()).order_by(Booking.start_time, Booking.id)
+    else:
+        query = query.order_by(Booking.start_time.desc(), Booking.id.desc())
+
+    result = await db.execute(query.offset(offset).limit(BOOKINGS_PAGE_SIZE + 1))
+    rows = result.all()
+
+    if not rows:
+        if offset:
+            return "No more bookings."
+        if upcoming_only:
+            return "You don't have any upcoming bookings."
+        return "You don't have any bookings yet."
+
+    return _payload(
+        columns=["id", "status", "space", "date", "start", "end", "total"],
+        rows=[
+            [
+                booking_id,
+                status.value,
+                space_name,
+                start.strftime("%Y-%m-%d"),
+                start.strftime("%H:%M"),
+                end.strftime("%H:%M"),
+                total_price,
+            ]
+            for booking_id, status, space_name, start, end, total_price in rows[:BOOKINGS_PAGE_SIZE]
+        ],
+        next_offset=offset + BOOKINGS_PAGE_SIZE if len(rows) > BOOKINGS_PAGE_SIZE else None,
+    )
+
+
+@tool
+async def cancel_booking(
+    booking_id: int,
+    *,
+    config: RunnableConfig,
+) -> str:
+    """
+    Cancel an existing booking.
+    
+    Args:
+        booking_id: The ID of the booking to cancel
+        
+    Returns:
+        Confirmation of cancellation or error message
+    """
+    user = _user(config)
 
-        db.add(booking)
-        await db.commit()
-        await db.refresh(booking)
-
-        return (
-            f"Booking confirmed!\n\n"
-            f"**Booking Details:**\n"
-            f"- Booking ID: #{booking.id}\n"
-            f"- Space: {space.name}\n"
-            f"- Location: {space.location}\n"
-            f"- Date: {booking_date}\n"
-            f"- Time: {start_hour:02d}:00 - {end_hour:02d}:00 ({duration_hours} hour{'s' if duration_hours > 1 else ''})\n"
-            f"- Total: RM{total_price:.2f}\n\n"
-            f"You can view this booking in your 'My Bookings' page."
-        )
+    if not user:
+        return "You need to be logged in to cancel a booking. Please sign in first."
 
-    @tool
-    async def get_user_bookings(
-        upcoming_only: bool = True,
-    ) -> str:
-        """
-        Get the current user's bookings.
-        
-        Args:
-            upcoming_only: If True, only show future bookings. If False, show all bookings.
-            
-        Returns:
-            List of user's bookings
-        """
-        if not user:
-            return "You need to be logged in to view your bookings. Please sign in first."
+    return await _in_session(config, _cancel_booking, _memo(config), user, booking_id)
 
-        query = select(Booking).where(Booking.user_id == user.id)
 
-        if upcoming_only:
-            query = query.where(Booking.start_time >= datetime.utcnow())
-
-        result = await db.execute(query.order_by(Booking.start_time))
-        bookings = result.scalars().all()
-
-        if not bookings:
-            if upcoming_only:
-                return "You don't have any upcoming bookings."
-            return "You don't have any bookings yet."
-
-        # Get space details
-        space_ids = [b.space_id for b in bookings]
-        result = await db.execute(select(Space).where(Space.id.in_(space_ids)))
-        spaces = {s.id: s for s in result.scalars().all()}
-
-        response = f"Your {'upcoming ' if upcoming_only else ''}bookings:\n\n"
-        for booking in bookings:
-            space = spaces.get(booking.space_id)
-            space_name = space.name if space else f"Space #{booking.space_id}"
-            
-            start = booking.start_time
-            end = booking.end_time
-            
-            response += f"- **Booking #{booking.id}** - {booking.status.value.title()}\n"
-            response += f"  Space: {space_name}\n"
-            response += f"  Date: {start.strftime('%Y-%m-%d')}\n"
-            response += f"  Time: {start.strftime('%H:%M')} - {end.strftime('%H:%M')}\n"
-            response += f"  Total: RM{booking.total_price:.2f}\n\n"
-
-        return response
-
-    @tool
-    async def cancel_booking(
-        booking_id: int,
-    ) -> str:
-        """
-        Cancel an existing booking.
-        
-        Args:
-            booking_id: The ID of the booking to cancel
-            
-        Returns:
-            Confirmation of cancellation or error message
-        """
-        if not user:
-            return "You need to be logged in to cancel a booking. Please sign in first."
-
-        result = await db.execute(
-            select(Booking).where(Booking.id == booking_id)
-        )
-        booking = result.scalar_one_or_none()
+async def _cancel_booking(db: AsyncSession, memo: RunMemo, user: User, booking_id: int) -> str:
+    result = await db.execute(
+        select(Booking).where(Booking.id == booking_id)
+    )
+    booking = result.scalar_one_or_none()
 
-        if not booking:
-            return f"Booking #{booking_id} not found."
+    if not booking:
+        return f"Booking #{booking_id} not found."
 
-        if booking.user_id != user.id:
-            return "You can only cancel your own bookings."
+    if booking.user_id != user.id:
+        return "You can only cancel your own bookings."
 
-        if booking.status == BookingStatus.cancelled:
-            return f"Booking #{booking_id} is already cancelled."
+    if booking.status == BookingStatus.cancelled:
+        return f"Booking #{booking_id} is already cancelled."
 
-        if booking.start_time < datetime.utcnow():
-            return "Cannot cancel a booking that has already started or passed."
+    if booking.start_time < datetime.utcnow():
+        return "Cannot cancel a booking that has already started or passed."
 
-        booking.status = BookingStatus.cancelled
-        await db.commit()
+    before = booking_state(booking)
+    booking.status = BookingStatus.cancelled
+    await apply_booking_change(db, before, booking_state(booking))
+    await db.commit()
+    booking_index.sync(booking)
+    await invalidation.bookings_changed(booking.space_id)
+    memo.after_write()
 
-        return f"Booking #{booking_id} has been cancelled successfully."
+    return f"Booking #{booking_id} has been cancelled successfully."
 
-    return [search_spaces, check_availability, create_booking, get_user_bookings, cancel_booking]
 
+def get_agent_tools():
+    """Booking tools; user and the run's RunMemo come from config["configurable"] at call time.
 
+    Each tool call opens its own pooled session, so the calls of one model
+    step run in parallel.
+    """
+    return [search_spaces, check_availability, create_booking, get_user_bookings, cancel_booking]
@@ -1,16 +1,134 @@
+import time
+
+from sqlalchemy import event, exc, make_url, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
+
+class PoolStats:
+    """Checkout counts and time spent waiting for a pooled connection."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool) -> None:
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long each checkout waits for a connection
+    (including opening a new one when the pool may still grow)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - started, timed_out)
+
+
+def _engine_options(url: str) -> dict:
+    if make_url(url).get_backend_name() != "postgresql":
+        return {}
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": {
+            # asyncpg's per-connection prepared statement cache, and
+            # SQLAlchemy's cache of prepared statements on top of it
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        },
+    }
+
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
+    **_engine_options(settings.database_url),
 )
 
+# Read-only traffic goes to the replica when one is configured
+if settings.database_read_url:
+    read_engine = create_async_engine(
+        settings.database_read_url,
+        echo=settings.debug,
+        **_engine_options(settings.database_read_url),
+    )
+else:
+    read_engine = engine
+
+
+class TrackedSyncSession(Session):
+    """Session that records whether the current transaction wrote anything."""
+
+
+@event.listens_for(TrackedSyncSession, "do_orm_execute")
+def _track_statement(orm_execute_state: ORMExecuteState) -> None:
+    # Anything but a SELECT (including raw text()) counts as a write
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(TrackedSyncSession, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(TrackedSyncSession, "after_commit")
+@event.listens_for(TrackedSyncSession, "after_rollback")
+def _reset_writes(session: Session) -> None:
+    session.info["has_writes"] = False
+
+
+class TrackedSession(AsyncSession):
+    """AsyncSession that knows whether it has uncommitted writes.
+
+    Like any AsyncSession it only checks out a connection on first use.
+    """
+
+    sync_session_class = TrackedSyncSession
+
+    @property
+    def has_writes(self) -> bool:
+        return bool(
+            self.sync_session.info.get("has_writes")
+            or self.new
+            or self.dirty
+            or self.deleted
+        )
+
+
 async_session_maker = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=TrackedSession,
+    expire_on_commit=False,
+)
+
+read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=TrackedSession,
     expire_on_commit=False,
 )
 
@@ -23,7 +141,9 @@ async def get_db():
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
+            # Read-only requests just give their connection back on close
+            if session.has_writes:
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -31,8 +151,63 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Session for read-only endpoints, on the replica if there is one.
+
+    The replica can lag the primary by a moment, so reads that must see the
+    caller's own just-committed writes (and loads that fill a shared cache)
+    use get_db instead.
+    """
+    async with read_session_maker() as session:
+        yield session
+
+
+async def release_connection(session: TrackedSession) -> None:
+    """Return a read-only session's connection to the pool now rather than at
+    the end of the request. Loaded objects stay usable (detached); the
+    session reconnects if it is used again."""
+    if not session.has_writes:
+        await session.close()
+
+
+# pg_advisory_xact_lock key serializing schema creation across processes
+SCHEMA_LOCK_KEY = 0x696E6638
+
+
 async def create_tables():
     async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Workers or replicas starting together create the schema one at
+            # a time; the lock is released when this transaction ends
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            # Needed by the bookings no-overlap exclusion constraint
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
         await conn.run_sync(Base.metadata.create_all)
 
 
+def _pool_status(pool) -> dict:
+    if not isinstance(pool, InstrumentedPool):
+        return {"pool": type(pool).__name__}
+
+    stats = pool.stats
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_avg_ms": round(stats.wait_total / stats.checkouts * 1000, 3) if stats.checkouts else 0.0,
+        "wait_max_ms": round(stats.wait_max * 1000, 3),
+    }
+
+
+def pool_status() -> dict:
+    """Current pool occupancy and cumulative checkout waits (the replica's
+    pool under "read_replica" when one is configured)."""
+    status = _pool_status(engine.pool)
+    if read_engine is not engine:
+        status["read_replica"] = _pool_status(read_engine.pool)
+    return status
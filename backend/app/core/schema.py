@@ -0,0 +1,82 @@
+"""
+Database schema setup at startup, selected with SCHEMA_MODE:
+- migrate: apply pending Alembic migrations (backend/migrations)
+- check: only verify the database is at the latest revision, for workers
+  started after a prestart step (python -m app.prestart) migrated it
+- create_all: create missing tables straight from the models, for
+  throwaway local or SQLite databases
+"""
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import SCHEMA_LOCK_KEY, create_tables, engine
+
+SCHEMA_MODES = ("migrate", "check", "create_all")
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Databases built by create_all before migrations existed start here
+BASELINE_REVISION = "0001"
+
+
+def _alembic_config(connection: Optional[Connection] = None) -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+def _current_revision(connection: Connection) -> Optional[str]:
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def _upgrade(connection: Connection) -> None:
+    config = _alembic_config(connection)
+    if _current_revision(connection) is None and inspect(connection).has_table("bookings"):
+        # Later revisions skip objects that create_all already made
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+async def migrate() -> None:
+    """Bring the database to the latest revision (one process at a time)."""
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        await conn.run_sync(_upgrade)
+
+
+async def check_schema() -> None:
+    """Fail fast if the database isn't at the latest revision."""
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_current_revision)
+    head = head_revision()
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}; "
+            "run `alembic upgrade head` (or python -m app.prestart) first"
+        )
+
+
+async def prepare_schema(mode: Optional[str] = None) -> None:
+    mode = mode or settings.schema_mode
+    if mode == "migrate":
+        await migrate()
+    elif mode == "check":
+        await check_schema()
+    elif mode == "create_all":
+        await create_tables()
+    else:
+        raise ValueError(f"Unknown SCHEMA_MODE: {mode!r} (expected one of {SCHEMA_MODES})")
@@ -1,3 +1,6 @@
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
@@ -5,6 +8,7 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.core.config import settings
 from app.core.database import get_db
@@ -48,6 +52,73 @@ def decode_supabase_token(token: str) -> Optional[dict]:
         return None
 
 
+class VerifiedTokenCache:
+    """Bounded LRU of verified tokens -> (claims, user column snapshot)."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict, dict]] = OrderedDict()
+        self._keys_by_user: dict[int, set[str]] = {}
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[tuple[dict, dict]]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, claims, snapshot = entry
+        if time.time() >= expires_at:
+            self._discard(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return claims, snapshot
+
+    def put(self, token: str, claims: dict, snapshot: dict) -> None:
+        expires_at = time.time() + self._ttl_seconds
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+
+        key = self._key(token)
+        self._discard(key)
+        self._entries[key] = (expires_at, claims, snapshot)
+        self._keys_by_user.setdefault(snapshot["id"], set()).add(key)
+
+        while len(self._entries) > self._max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[2]["id"]
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token of a user whose role or status changed."""
+        for key in list(self._keys_by_user.get(user_id, ())):
+            self._discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+
+token_cache = VerifiedTokenCache(
+    max_entries=settings.auth_cache_max_entries,
+    ttl_seconds=settings.auth_cache_ttl_seconds,
+)
+
+
 def decode_token(token: str) -> Optional[dict]:
     """Decode token - tries Supabase first, then legacy"""
     # Try Supabase token first
@@ -80,6 +151,21 @@ async def get_current_user(
     if not token:
         raise credentials_exception
 
+    cached = token_cache.get(token)
+    if cached is not None:
+        _, snapshot = cached
+        # Attach the snapshot to this session without a round trip so that
+        # relationship lookups resolve from the identity map as before
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        user = await db.merge(user, load=False)
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="User account is disabled"
+            )
+        return user
+
     payload = decode_token(token)
     if payload is None:
         raise credentials_exception
@@ -107,6 +193,12 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
 
+    token_cache.put(
+        token,
+        payload,
+        {column.key: getattr(user, column.key) for column in User.__table__.columns},
+    )
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
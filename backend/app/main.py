@@ -1,16 +1,29 @@
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.database import create_tables
+from app.agent.graph import init_agent_graph
+from app.agent.memory import open_checkpointer
+from app.core.schema import prepare_schema
 from app.routers import auth_router, spaces_router, bookings_router, admin_router, chat_router
+from app.services.invalidation import listen_for_invalidations
+
+
+# App loggers (e.g. the one-JSON-line-per-turn "app.agent" run log)
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables
-    await create_tables()
-    yield
+    # Startup: migrate or just check the schema, per SCHEMA_MODE
+    await prepare_schema()
+    # Build the Bedrock client and compile the agent graph once, around the
+    # checkpointer that stores conversation threads; keep this worker's
+    # caches in step with writes made by the others
+    async with open_checkpointer() as checkpointer, listen_for_invalidations():
+        init_agent_graph(checkpointer)
+        yield
     # Shutdown: cleanup if needed
 
 
@@ -34,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # Include routers
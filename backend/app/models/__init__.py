@@ -1,7 +1,8 @@
 from app.models.user import User
 from app.models.space import Space
 from app.models.booking import Booking
+from app.models.rollup import BookingDailyRollup
 
-__all__ = ["User", "Space", "Booking"]
+__all__ = ["User", "Space", "Booking", "BookingDailyRollup"]
 
 
@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Integer, ForeignKey, Numeric, Text, Enum as SQLEnum
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Numeric, Text, Index, Enum as SQLEnum
+from sqlalchemy import literal_column, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -13,8 +15,27 @@ class BookingStatus(str, enum.Enum):
     completed = "completed"
 
 
+# Name of the exclusion constraint rejecting overlapping active bookings
+BOOKING_NO_OVERLAP_CONSTRAINT = "bookings_no_overlap"
+
+
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_space_id_start_time", "space_id", "start_time"),
+        Index("ix_bookings_user_id_start_time", "user_id", "start_time"),
+        Index("ix_bookings_status_start_time", "status", "start_time"),
+        Index("ix_bookings_start_time_id", "start_time", "id"),
+        Index("ix_bookings_created_at", "created_at"),
+        # Requires the btree_gist extension (created by migration 0002 or create_tables)
+        ExcludeConstraint(
+            ("space_id", "="),
+            (literal_column("tstzrange(start_time, end_time)"), "&&"),
+            name=BOOKING_NO_OVERLAP_CONSTRAINT,
+            using="gist",
+            where=text("status IN ('confirmed', 'pending')"),
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
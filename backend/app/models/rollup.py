@@ -0,0 +1,23 @@
+from datetime import date
+from sqlalchemy import Date, Integer, ForeignKey, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class BookingDailyRollup(Base):
+    """Per-space, per-day booking counters maintained alongside booking writes."""
+
+    __tablename__ = "booking_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    space_id: Mapped[int] = mapped_column(Integer, ForeignKey("spaces.id"), primary_key=True)
+    # Bookings created on this day, any status
+    bookings_created: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Confirmed bookings starting on this day
+    bookings_confirmed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Confirmed/completed revenue of bookings created on this day
+    revenue: Mapped[float] = mapped_column(Numeric(12, 2), default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<BookingDailyRollup {self.day} Space {self.space_id}>"
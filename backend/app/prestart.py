@@ -0,0 +1,18 @@
+"""
+One-off startup tasks, run once before the server's worker processes start:
+
+    python -m app.prestart
+"""
+import asyncio
+
+from app.core.database import engine
+from app.core.schema import migrate
+
+
+async def main() -> None:
+    await migrate()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,89 +1,162 @@
-from datetime import datetime, date, timedelta
+import base64
+import json
+from datetime import datetime, date, timedelta, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, case, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, pool_status
 from app.core.security import get_current_admin_user
 from app.models.space import Space
 from app.models.booking import Booking, BookingStatus
 from app.models.user import User, UserRole
+from app.models.rollup import BookingDailyRollup
 from app.schemas.booking import BookingResponse, BookingUpdate
 from app.schemas.user import UserResponse
+from app.services.booking_index import booking_index, is_overlap_violation
+from app.services.invalidation import bookings_changed, user_changed
+from app.services.rollups import apply_booking_change, booking_state, rebuild_rollups
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+# Keyset pagination: the next page's cursor is returned in this header so the
+# response body stays a plain list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
 
 @router.get("/stats")
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_db),
+    date_from: Optional[date] = Query(None, description="Start of an extra reporting range (UTC)"),
+    date_to: Optional[date] = Query(None, description="End of the reporting range, inclusive (defaults to today)"),
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(get_current_admin_user)
 ):
-    today = date.today()
-    start_of_today = datetime.combine(today, datetime.min.time())
-    end_of_today = datetime.combine(today, datetime.max.time())
-    start_of_month = datetime(today.year, today.month, 1)
-
-    # Total spaces
-    total_spaces = await db.execute(select(func.count(Space.id)).where(Space.is_active == True))
-    total_spaces = total_spaces.scalar()
-
-    # Total users
-    total_users = await db.execute(select(func.count(User.id)).where(User.role == UserRole.user))
-    total_users = total_users.scalar()
-
-    # Bookings today
-    bookings_today = await db.execute(
-        select(func.count(Booking.id)).where(
-            and_(
-                Booking.start_time >= start_of_today,
-                Booking.start_time <= end_of_today,
-                Booking.status == BookingStatus.confirmed
-            )
-        )
-    )
-    bookings_today = bookings_today.scalar()
-
-    # Revenue this month
-    revenue_month = await db.execute(
-        select(func.sum(Booking.total_price)).where(
-            and_(
-                Booking.created_at >= start_of_month,
-                Booking.status.in_([BookingStatus.confirmed, BookingStatus.completed])
-            )
+    today = datetime.now(timezone.utc).date()
+    start_of_month = today.replace(day=1)
+    start_of_week = today - timedelta(days=6)
+
+    if date_from and not date_to:
+        date_to = today
+    if date_to and not date_from:
+        date_from = date_to
+    if date_from and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be before date_from"
         )
-    )
-    revenue_month = revenue_month.scalar() or 0
 
-    # Recent bookings count
-    recent_bookings = await db.execute(
-        select(func.count(Booking.id)).where(
-            Booking.created_at >= datetime.utcnow() - timedelta(days=7)
+    rollup = BookingDailyRollup
+
+    def total(column, start: date, end: date):
+        return func.coalesce(
+            func.sum(case((rollup.day.between(start, end), column), else_=0)), 0
         )
+
+    # One statement: catalog/user counts as scalar subqueries plus windowed
+    # sums over the daily rollup
+    columns = [
+        select(func.count(Space.id)).where(Space.is_active == True)
+        .scalar_subquery().label("total_spaces"),
+        select(func.count(User.id)).where(User.role == UserRole.user)
+        .scalar_subquery().label("total_users"),
+        total(rollup.bookings_confirmed, today, today).label("bookings_today"),
+        total(rollup.revenue, start_of_month, today).label("revenue_this_month"),
+        total(rollup.bookings_created, start_of_week, today).label("bookings_last_7_days"),
+    ]
+    lower_bound = min(start_of_month, start_of_week)
+    upper_bound = today
+    if date_from:
+        columns += [
+            total(rollup.bookings_created, date_from, date_to).label("bookings_created"),
+            total(rollup.bookings_confirmed, date_from, date_to).label("bookings_confirmed"),
+            total(rollup.revenue, date_from, date_to).label("revenue"),
+        ]
+        lower_bound = min(lower_bound, date_from)
+        upper_bound = max(upper_bound, date_to)
+
+    result = await db.execute(
+        select(*columns).select_from(rollup).where(rollup.day.between(lower_bound, upper_bound))
     )
-    recent_bookings = recent_bookings.scalar()
-
-    return {
-        "total_spaces": total_spaces,
-        "total_users": total_users,
-        "bookings_today": bookings_today,
-        "revenue_this_month": float(revenue_month),
-        "bookings_last_7_days": recent_bookings,
+    row = result.one()
+
+    stats = {
+        "total_spaces": row.total_spaces,
+        "total_users": row.total_users,
+        "bookings_today": int(row.bookings_today),
+        "revenue_this_month": float(row.revenue_this_month),
+        "bookings_last_7_days": int(row.bookings_last_7_days),
     }
+    if date_from:
+        stats["range"] = {
+            "date_from": str(date_from),
+            "date_to": str(date_to),
+            "bookings_created": int(row.bookings_created),
+            "bookings_confirmed": int(row.bookings_confirmed),
+            "revenue": float(row.revenue),
+        }
+    return stats
+
+
+@router.post("/stats/rebuild")
+async def rebuild_dashboard_rollups(
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_current_admin_user)
+):
+    """Recompute the daily booking rollups from the bookings table"""
+    rows = await rebuild_rollups(db)
+    await db.commit()
+    return {"message": f"Rebuilt {rows} rollup rows"}
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the row after which the next page starts"""
+    raw = json.dumps([sort_value.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def set_next_cursor(response: Response, rows: list, limit: int, sort_attr: str) -> list:
+    """Trim the look-ahead row and expose the next page's cursor in a header"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_attr), last.id)
+    return rows
+
+
+@router.get("/metrics/pool")
+async def get_pool_metrics(admin: User = Depends(get_current_admin_user)):
+    """Database pool occupancy and how long requests wait for a connection."""
+    return pool_status()
 
 
 @router.get("/bookings", response_model=List[BookingResponse])
 async def get_all_bookings(
+    response: Response,
     status: Optional[BookingStatus] = Query(None),
     space_id: Optional[int] = Query(None),
     user_id: Optional[int] = Query(None),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
-    limit: int = Query(50, le=100),
-    offset: int = Query(0),
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    offset: int = Query(0, deprecated=True),
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(get_current_admin_user)
 ):
     query = select(Booking).options(
@@ -101,12 +174,16 @@ async def get_all_bookings(
         query = query.where(Booking.start_time >= datetime.combine(date_from, datetime.min.time()))
     if date_to:
         query = query.where(Booking.start_time <= datetime.combine(date_to, datetime.max.time()))
+    if cursor:
+        query = query.where(tuple_(Booking.start_time, Booking.id) < decode_cursor(cursor))
+    elif offset:
+        query = query.offset(offset)
 
     result = await db.execute(
-        query.order_by(Booking.start_time.desc()).limit(limit).offset(offset)
+        query.order_by(Booking.start_time.desc(), Booking.id.desc()).limit(limit + 1)
     )
     bookings = result.scalars().all()
-    return bookings
+    return set_next_cursor(response, bookings, limit, "start_time")
 
 
 @router.put("/bookings/{booking_id}", response_model=BookingResponse)
@@ -127,33 +204,52 @@ async def update_booking(
             detail="Booking not found"
         )
 
+    before = booking_state(booking)
     update_data = booking_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(booking, field, value)
 
-    await db.commit()
+    try:
+        await apply_booking_change(db, before, booking_state(booking))
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if not is_overlap_violation(exc):
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking overlaps another active booking for this space"
+        )
     await db.refresh(booking)
+    booking_index.sync(booking)
+    await bookings_changed(before.space_id, booking.space_id)
     return booking
 
 
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
+    response: Response,
     role: Optional[UserRole] = Query(None),
-    limit: int = Query(50, le=100),
-    offset: int = Query(0),
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    offset: int = Query(0, deprecated=True),
+    db: AsyncSession = Depends(get_read_db),
     admin: User = Depends(get_current_admin_user)
 ):
     query = select(User)
 
     if role:
         query = query.where(User.role == role)
+    if cursor:
+        query = query.where(tuple_(User.created_at, User.id) < decode_cursor(cursor))
+    elif offset:
+        query = query.offset(offset)
 
     result = await db.execute(
-        query.order_by(User.created_at.desc()).limit(limit).offset(offset)
+        query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1)
     )
     users = result.scalars().all()
-    return users
+    return set_next_cursor(response, users, limit, "created_at")
 
 
 @router.put("/users/{user_id}/role")
@@ -175,6 +271,7 @@ async def update_user_role(
     user.role = role
     await db.commit()
     await db.refresh(user)
+    await user_changed(user.id)
 
     return {"message": f"User role updated to {role.value}"}
 
@@ -2,15 +2,22 @@ from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
+from app.agent.cache import agent_cache
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.space import Space
 from app.models.booking import Booking, BookingStatus
 from app.models.user import User
 from app.schemas.booking import BookingCreate, BookingUpdate, BookingResponse
+from app.schemas.space import SpaceResponse
+from app.schemas.user import UserResponse
+from app.services.booking_index import booking_index, is_overlap_violation
+from app.services.invalidation import bookings_changed
+from app.services.rollups import apply_booking_change, booking_state
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
@@ -23,22 +30,10 @@ async def check_availability(
     exclude_booking_id: Optional[int] = None
 ) -> bool:
     """Check if a space is available for the given time range"""
-    query = select(Booking).where(
-        and_(
-            Booking.space_id == space_id,
-            Booking.status.in_([BookingStatus.confirmed, BookingStatus.pending]),
-            # Check for overlap: NOT (new_end <= existing_start OR new_start >= existing_end)
-            Booking.start_time < end_time,
-            Booking.end_time > start_time,
-        )
+    has_conflict = await booking_index.has_conflict(
+        db, space_id, start_time, end_time, exclude_booking_id
     )
-
-    if exclude_booking_id:
-        query = query.where(Booking.id != exclude_booking_id)
-
-    result = await db.execute(query)
-    conflicting_booking = result.scalar_one_or_none()
-    return conflicting_booking is None
+    return not has_conflict
 
 
 def calculate_price(space: Space, start_time: datetime, end_time: datetime) -> float:
@@ -54,8 +49,10 @@ async def get_my_bookings(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    # Stays on the primary: this list is fetched right after creating a booking
     query = select(Booking).options(
-        selectinload(Booking.space)
+        selectinload(Booking.space),
+        selectinload(Booking.user)
     ).where(Booking.user_id == current_user.id)
 
     if status:
@@ -105,28 +102,51 @@ async def create_booking(
     # Calculate price
     total_price = calculate_price(space, booking_data.start_time, booking_data.end_time)
 
-    # Create booking
-    booking = Booking(
-        user_id=current_user.id,
-        space_id=booking_data.space_id,
-        start_time=booking_data.start_time,
-        end_time=booking_data.end_time,
-        total_price=total_price,
-        notes=booking_data.notes,
-        status=BookingStatus.confirmed,
-    )
-
-    db.add(booking)
-    await db.commit()
-    await db.refresh(booking)
-
-    # Load space relationship
-    result = await db.execute(
-        select(Booking).options(selectinload(Booking.space)).where(Booking.id == booking.id)
+    # Create booking in a single INSERT ... RETURNING; the no-overlap
+    # constraint is the final arbiter if the slot was taken meanwhile
+    try:
+        result = await db.execute(
+            insert(Booking).values(
+                user_id=current_user.id,
+                space_id=booking_data.space_id,
+                start_time=booking_data.start_time,
+                end_time=booking_data.end_time,
+                total_price=total_price,
+                notes=booking_data.notes,
+                status=BookingStatus.confirmed,
+            ).returning(Booking)
+        )
+        booking = result.scalar_one()
+        await apply_booking_change(db, None, booking_state(booking))
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if not is_overlap_violation(exc):
+            raise
+        # Another request (or worker) took the slot after our index check
+        booking_index.invalidate(booking_data.space_id)
+        agent_cache.invalidate_bookings(booking_data.space_id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Space is not available for the selected time slot"
+        )
+    booking_index.sync(booking)
+    await bookings_changed(booking.space_id)
+
+    # Build the response from rows we already hold instead of reloading
+    return BookingResponse(
+        id=booking.id,
+        user_id=booking.user_id,
+        space_id=booking.space_id,
+        start_time=booking.start_time,
+        end_time=booking.end_time,
+        status=booking.status,
+        total_price=booking.total_price,
+        notes=booking.notes,
+        created_at=booking.created_at,
+        space=SpaceResponse.model_validate(space),
+        user=UserResponse.model_validate(current_user),
     )
-    booking = result.scalar_one()
-
-    return booking
 
 
 @router.get("/{booking_id}", response_model=BookingResponse)
@@ -186,7 +206,11 @@ async def cancel_booking(
             detail="Booking is already cancelled"
         )
 
+    before = booking_state(booking)
     booking.status = BookingStatus.cancelled
+    await apply_booking_change(db, before, booking_state(booking))
     await db.commit()
+    booking_index.sync(booking)
+    await bookings_changed(booking.space_id)
 
 
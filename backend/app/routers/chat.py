@@ -1,15 +1,19 @@
 """
 Chat endpoint for the AI booking assistant.
 """
+import json
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.security import get_current_user, oauth2_scheme
+from app.core.config import settings
+from app.core.database import get_db, release_connection
+from app.core.security import get_current_admin_user, get_current_user, oauth2_scheme
 from app.models.user import User
-from app.agent.graph import run_agent
+from app.agent.graph import run_agent, stream_agent
+from app.agent.metrics import agent_metrics
 
 router = APIRouter(prefix="/agent", tags=["AI Agent"])
 
@@ -21,12 +25,17 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     message: str
+    # Conversation to continue; omit to start a new one
+    thread_id: Optional[str] = None
+    # Deprecated: only used to seed a new thread for clients without thread_id
     conversation_history: Optional[List[ChatMessage]] = None
 
 
 class ChatResponse(BaseModel):
     response: str
-    conversation_history: List[ChatMessage]
+    thread_id: str
+    # Echoed back only to clients still sending conversation_history
+    conversation_history: Optional[List[ChatMessage]] = None
 
 
 async def get_optional_user(
@@ -50,7 +59,10 @@ async def get_optional_user(
             return None
         
         result = await db.execute(select(User).where(User.id == int(user_id)))
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+        # Don't pin a pooled connection while the model works; tools use their own sessions
+        await release_connection(db)
+        return user
     except Exception:
         return None
 
@@ -58,7 +70,6 @@ async def get_optional_user(
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_agent(
     request: ChatRequest,
-    db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_optional_user),
 ):
     """
@@ -77,22 +88,24 @@ async def chat_with_agent(
         if request.conversation_history:
             history = [{"role": msg.role, "content": msg.content} for msg in request.conversation_history]
         
-        # Run the agent
-        response, updated_history = await run_agent(
-            db=db,
+        # Run the agent; the conversation itself is kept server-side per thread
+        response, thread_id = await run_agent(
             user=current_user,
             message=request.message,
+            thread_id=request.thread_id,
             conversation_history=history,
         )
         
-        # Convert back to ChatMessage format
-        history_messages = [
-            ChatMessage(role=msg["role"], content=msg["content"])
-            for msg in updated_history
-        ]
+        history_messages = None
+        if request.conversation_history is not None and request.thread_id is None:
+            history_messages = request.conversation_history + [
+                ChatMessage(role="user", content=request.message),
+                ChatMessage(role="assistant", content=response),
+            ]
         
         return ChatResponse(
             response=response,
+            thread_id=thread_id,
             conversation_history=history_messages,
         )
         
@@ -107,9 +120,66 @@ async def chat_with_agent(
         )
 
 
+@router.post("/chat/stream")
+async def stream_chat_with_agent(
+    request: ChatRequest,
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    """
+    Chat with the AI booking assistant over Server-Sent Events.
+
+    Emits `token`, `tool_start` and `tool_end` events while the agent works,
+    then a `done` event with the final response and thread_id.
+    An `error` event is sent instead if the run fails.
+    """
+    history = None
+    if request.conversation_history:
+        history = [{"role": msg.role, "content": msg.content} for msg in request.conversation_history]
+
+    async def event_stream():
+        try:
+            async for event, data in stream_agent(
+                user=current_user,
+                message=request.message,
+                thread_id=request.thread_id,
+                conversation_history=history,
+            ):
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+
+            error = {"detail": f"Error processing request: {str(e)}"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so events reach the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/metrics")
+async def get_agent_metrics(admin: User = Depends(get_current_admin_user)):
+    """Assistant metrics for this worker.
+
+    Counters cover fast-path and cache hits, agent runs, tokens and estimated
+    spend; distributions cover run, node, model and per-tool latency (ms),
+    iterations and tokens per run.
+    """
+    return agent_metrics.snapshot()
+
+
 @router.get("/status")
 async def agent_status():
     """Check if the AI agent is available."""
+    if settings.agent_llm_provider != "bedrock":
+        return {
+            "status": "available",
+            "message": f"AI assistant is running on the {settings.agent_llm_provider} model"
+        }
+
     try:
         import boto3
         
@@ -1,47 +1,120 @@
-from datetime import datetime, date
+from datetime import datetime, date, time
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import get_current_user, get_current_admin_user
 from app.models.space import Space
 from app.models.booking import Booking, BookingStatus
 from app.models.user import User
-from app.schemas.space import SpaceCreate, SpaceUpdate, SpaceResponse, SpaceAvailability
+from app.schemas.space import (
+    SpaceCreate,
+    SpaceUpdate,
+    SpaceResponse,
+    SpaceAvailability,
+    SpaceAvailabilityDay,
+    SpaceAvailabilityRange,
+    SpaceAvailabilityMask,
+    SpaceAvailabilityMatrix,
+)
+from app.services.availability import (
+    CLOSING_HOUR,
+    OPENING_HOUR,
+    SUPPORTED_GRANULARITIES,
+    DayGrid,
+    free_masks_for_range,
+    slot_labels,
+)
+from app.services.catalog import space_catalog, etag_response, catalog_etag
+from app.services.invalidation import spaces_changed
 
 router = APIRouter(prefix="/spaces", tags=["Spaces"])
 
+MAX_AVAILABILITY_RANGE_DAYS = 31
+
+
+def validate_granularity(granularity: int) -> int:
+    if granularity not in SUPPORTED_GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"granularity must be one of {list(SUPPORTED_GRANULARITIES)}"
+        )
+    return granularity
+
 
 @router.get("", response_model=List[SpaceResponse])
 async def list_spaces(
+    request: Request,
     type: Optional[str] = Query(None, description="Filter by space type"),
     location: Optional[str] = Query(None, description="Filter by location"),
     min_capacity: Optional[int] = Query(None, description="Minimum capacity"),
     max_price: Optional[float] = Query(None, description="Maximum price per hour"),
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(Space).where(Space.is_active == True)
+    catalog = await space_catalog.load(db)
+    spaces = catalog.list(type, location, min_capacity, max_price)
+    body = b"[" + b",".join(space.json for space in spaces) + b"]"
+    return etag_response(
+        request, body, catalog_etag(catalog, "list", type, location, min_capacity, max_price)
+    )
 
-    if type:
-        query = query.where(Space.type == type)
-    if location:
-        query = query.where(Space.location.ilike(f"%{location}%"))
-    if min_capacity:
-        query = query.where(Space.capacity >= min_capacity)
-    if max_price:
-        query = query.where(Space.price_per_hour <= max_price)
 
-    result = await db.execute(query.order_by(Space.name))
-    spaces = result.scalars().all()
-    return spaces
+@router.get("/availability", response_model=SpaceAvailabilityMatrix)
+async def get_availability_matrix(
+    date: date = Query(..., description="Date to check availability (YYYY-MM-DD)"),
+    type: Optional[str] = Query(None, description="Filter by space type"),
+    location: Optional[str] = Query(None, description="Filter by location"),
+    min_capacity: Optional[int] = Query(None, description="Minimum capacity"),
+    max_price: Optional[float] = Query(None, description="Maximum price per hour"),
+    granularity: int = Query(60, description="Slot length in minutes (15, 30 or 60)"),
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db)
+):
+    """Availability of every matching space on one date, packed as bitmasks"""
+    grid = DayGrid(date, validate_granularity(granularity))
+
+    # The catalog fills a shared cache, so it loads from the primary (only
+    # on a cache miss); the bookings can come from the replica
+    spaces = await space_catalog.list(db, type, location, min_capacity, max_price)
+
+    # One bookings query for all spaces, grouped by space_id in memory
+    bookings_by_space: dict[int, list[tuple[datetime, datetime]]] = {
+        space.id: [] for space in spaces
+    }
+    if spaces:
+        result = await read_db.execute(
+            select(Booking.space_id, Booking.start_time, Booking.end_time).where(
+                and_(
+                    Booking.space_id.in_(bookings_by_space.keys()),
+                    Booking.start_time < grid.closes_at,
+                    Booking.end_time > grid.opens_at,
+                    Booking.status.in_([BookingStatus.confirmed, BookingStatus.pending])
+                )
+            )
+        )
+        for space_id, start, end in result.all():
+            bookings_by_space[space_id].append((start, end))
+
+    return SpaceAvailabilityMatrix(
+        date=str(date),
+        slots=[start for start, _ in slot_labels(grid.granularity)],
+        spaces=[
+            SpaceAvailabilityMask(
+                space_id=space.id,
+                name=space.name,
+                mask=grid.free_mask(bookings_by_space[space.id])
+            )
+            for space in spaces
+        ]
+    )
 
 
 @router.get("/{space_id}", response_model=SpaceResponse)
-async def get_space(space_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Space).where(Space.id == space_id))
-    space = result.scalar_one_or_none()
+async def get_space(space_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    catalog = await space_catalog.load(db)
+    space = catalog.get(space_id)
 
     if not space:
         raise HTTPException(
@@ -49,15 +122,18 @@ async def get_space(space_id: int, db: AsyncSession = Depends(get_db)):
             detail="Space not found"
         )
 
-    return space
+    return etag_response(request, space.json, catalog_etag(catalog, "space", space_id))
 
 
 @router.get("/{space_id}/availability", response_model=SpaceAvailability)
 async def get_space_availability(
     space_id: int,
     date: date = Query(..., description="Date to check availability (YYYY-MM-DD)"),
-    db: AsyncSession = Depends(get_db)
+    granularity: int = Query(60, description="Slot length in minutes (15, 30 or 60)"),
+    db: AsyncSession = Depends(get_read_db)
 ):
+    grid = DayGrid(date, validate_granularity(granularity))
+
     # Check if space exists
     result = await db.execute(select(Space).where(Space.id == space_id))
     space = result.scalar_one_or_none()
@@ -68,50 +144,80 @@ async def get_space_availability(
             detail="Space not found"
         )
 
-    # Get all bookings for this space on the given date
-    start_of_day = datetime.combine(date, datetime.min.time())
-    end_of_day = datetime.combine(date, datetime.max.time())
-
+    # Get all bookings for this space overlapping the opening hours
     result = await db.execute(
-        select(Booking).where(
+        select(Booking.start_time, Booking.end_time).where(
             and_(
                 Booking.space_id == space_id,
-                Booking.start_time >= start_of_day,
-                Booking.end_time <= end_of_day,
+                Booking.start_time < grid.closes_at,
+                Booking.end_time > grid.opens_at,
                 Booking.status.in_([BookingStatus.confirmed, BookingStatus.pending])
             )
-        ).order_by(Booking.start_time)
+        )
     )
-    bookings = result.scalars().all()
-
-    # Generate time slots (9 AM to 9 PM, hourly)
-    slots = []
-    for hour in range(9, 21):  # 9 AM to 9 PM
-        slot_start = f"{hour:02d}:00"
-        slot_end = f"{hour + 1:02d}:00"
-
-        # Check if this slot overlaps with any booking
-        slot_start_dt = datetime.combine(date, datetime.strptime(slot_start, "%H:%M").time())
-        slot_end_dt = datetime.combine(date, datetime.strptime(slot_end, "%H:%M").time())
-
-        is_available = True
-        for booking in bookings:
-            # Check for overlap
-            if not (slot_end_dt <= booking.start_time.replace(tzinfo=None) or 
-                    slot_start_dt >= booking.end_time.replace(tzinfo=None)):
-                is_available = False
-                break
-
-        slots.append({
-            "start": slot_start,
-            "end": slot_end,
-            "available": is_available
-        })
 
     return SpaceAvailability(
         space_id=space_id,
         date=str(date),
-        available_slots=slots
+        available_slots=grid.slots(grid.free_mask(result.all()))
+    )
+
+
+@router.get("/{space_id}/availability/range", response_model=SpaceAvailabilityRange)
+async def get_space_availability_range(
+    space_id: int,
+    date_from: date = Query(..., description="First date to check (YYYY-MM-DD)"),
+    date_to: date = Query(..., description="Last date to check, inclusive (YYYY-MM-DD)"),
+    granularity: int = Query(60, description="Slot length in minutes (15, 30 or 60)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    validate_granularity(granularity)
+
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be before date_from"
+        )
+
+    if (date_to - date_from).days + 1 > MAX_AVAILABILITY_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_AVAILABILITY_RANGE_DAYS} days"
+        )
+
+    result = await db.execute(select(Space.id).where(Space.id == space_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Space not found"
+        )
+
+    # Load every booking touching the range in one query
+    range_start = datetime.combine(date_from, time(OPENING_HOUR))
+    range_end = datetime.combine(date_to, time(CLOSING_HOUR))
+
+    result = await db.execute(
+        select(Booking.start_time, Booking.end_time).where(
+            and_(
+                Booking.space_id == space_id,
+                Booking.start_time < range_end,
+                Booking.end_time > range_start,
+                Booking.status.in_([BookingStatus.confirmed, BookingStatus.pending])
+            )
+        )
+    )
+
+    return SpaceAvailabilityRange(
+        space_id=space_id,
+        date_from=str(date_from),
+        date_to=str(date_to),
+        slots=[start for start, _ in slot_labels(granularity)],
+        days=[
+            SpaceAvailabilityDay(date=str(grid.day), available=grid.flags(free_mask))
+            for grid, free_mask in free_masks_for_range(
+                result.all(), date_from, date_to, granularity
+            )
+        ]
     )
 
 
@@ -126,6 +232,7 @@ async def create_space(
     db.add(space)
     await db.commit()
     await db.refresh(space)
+    await spaces_changed()
     return space
 
 
@@ -151,6 +258,7 @@ async def update_space(
 
     await db.commit()
     await db.refresh(space)
+    await spaces_changed()
     return space
 
 
@@ -172,5 +280,6 @@ async def delete_space(
     # Soft delete - just deactivate
     space.is_active = False
     await db.commit()
+    await spaces_changed()
 
 
@@ -58,3 +58,28 @@ class SpaceAvailability(BaseModel):
     available_slots: List[dict]  # [{"start": "09:00", "end": "10:00", "available": True}]
 
 
+class SpaceAvailabilityDay(BaseModel):
+    date: str
+    available: List[bool]  # one flag per entry in SpaceAvailabilityRange.slots
+
+
+class SpaceAvailabilityRange(BaseModel):
+    space_id: int
+    date_from: str
+    date_to: str
+    slots: List[str]  # slot start times, e.g. ["09:00", "10:00", ...]
+    days: List[SpaceAvailabilityDay]
+
+
+class SpaceAvailabilityMask(BaseModel):
+    space_id: int
+    name: str
+    mask: int  # bit i is set when slots[i] is available
+
+
+class SpaceAvailabilityMatrix(BaseModel):
+    date: str
+    slots: List[str]  # slot start times, e.g. ["09:00", "10:00", ...]
+    spaces: List[SpaceAvailabilityMask]
+
+
@@ -0,0 +1,115 @@
+"""
+Bitmask availability engine.
+
+A space-day is represented as an integer whose bit i stands for the i-th
+slot between opening and closing time. Bookings are rasterized into a
+busy mask once; free/busy questions are then answered with bit operations.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Iterable
+
+OPENING_HOUR = 9
+CLOSING_HOUR = 21
+SUPPORTED_GRANULARITIES = (15, 30, 60)  # minutes per slot
+
+Interval = tuple[datetime, datetime]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@lru_cache(maxsize=None)
+def slot_labels(granularity: int = 60) -> tuple[tuple[str, str], ...]:
+    """(start, end) labels such as ("09:00", "09:30") for every slot of a day."""
+    minutes = range(OPENING_HOUR * 60, CLOSING_HOUR * 60, granularity)
+    return tuple(
+        (f"{m // 60:02d}:{m % 60:02d}", f"{(m + granularity) // 60:02d}:{(m + granularity) % 60:02d}")
+        for m in minutes
+    )
+
+
+class DayGrid:
+    """Slot layout of one day's opening hours at a fixed granularity."""
+
+    def __init__(self, day: date, granularity: int = 60):
+        if granularity not in SUPPORTED_GRANULARITIES:
+            raise ValueError(f"granularity must be one of {SUPPORTED_GRANULARITIES}")
+
+        self.day = day
+        self.granularity = granularity
+        self.opens_at = datetime.combine(day, time(OPENING_HOUR))
+        self.closes_at = datetime.combine(day, time(CLOSING_HOUR))
+        self.slot_count = (CLOSING_HOUR - OPENING_HOUR) * 60 // granularity
+        self.full_mask = (1 << self.slot_count) - 1
+        self._step = timedelta(minutes=granularity)
+
+    def span_mask(self, start: datetime, end: datetime) -> int:
+        """Bits of every slot touched by [start, end), clipped to opening hours."""
+        start = max(_naive_utc(start), self.opens_at)
+        end = min(_naive_utc(end), self.closes_at)
+        if end <= start:
+            return 0
+
+        first = (start - self.opens_at) // self._step
+        last = -((self.opens_at - end) // self._step)  # ceiling division
+        return ((1 << (last - first)) - 1) << first
+
+    def busy_mask(self, bookings: Iterable[Interval]) -> int:
+        mask = 0
+        for start, end in bookings:
+            mask |= self.span_mask(start, end)
+        return mask
+
+    def free_mask(self, bookings: Iterable[Interval]) -> int:
+        return self.full_mask & ~self.busy_mask(bookings)
+
+    def flags(self, free_mask: int) -> list[bool]:
+        return [bool(free_mask >> index & 1) for index in range(self.slot_count)]
+
+    def free_ranges(self, free_mask: int) -> list[tuple[str, str]]:
+        """Runs of consecutive free slots as (start, end) labels."""
+        labels = slot_labels(self.granularity)
+        ranges = []
+        index = 0
+        while index < self.slot_count:
+            if free_mask >> index & 1:
+                first = index
+                while index < self.slot_count and free_mask >> index & 1:
+                    index += 1
+                ranges.append((labels[first][0], labels[index - 1][1]))
+            else:
+                index += 1
+        return ranges
+
+    def slots(self, free_mask: int) -> list[dict]:
+        """Slot dicts in the shape of SpaceAvailability.available_slots."""
+        return [
+            {"start": start, "end": end, "available": bool(free_mask >> index & 1)}
+            for index, (start, end) in enumerate(slot_labels(self.granularity))
+        ]
+
+
+def free_masks_for_range(
+    bookings: Iterable[Interval],
+    date_from: date,
+    date_to: date,
+    granularity: int = 60,
+) -> list[tuple[DayGrid, int]]:
+    """Rasterize bookings into one free mask per day in [date_from, date_to]."""
+    grids = [
+        DayGrid(date_from + timedelta(days=offset), granularity)
+        for offset in range((date_to - date_from).days + 1)
+    ]
+    busy = [0] * len(grids)
+
+    for start, end in bookings:
+        first_day = max((_naive_utc(start).date() - date_from).days, 0)
+        last_day = min((_naive_utc(end).date() - date_from).days, len(grids) - 1)
+        for index in range(first_day, last_day + 1):
+            busy[index] |= grids[index].span_mask(start, end)
+
+    return [(grid, grid.full_mask & ~mask) for grid, mask in zip(grids, busy)]
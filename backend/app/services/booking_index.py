@@ -0,0 +1,214 @@
+"""
+In-memory interval index of active bookings, used for conflict detection.
+
+Each space keeps its confirmed/pending bookings that had not ended when it
+was loaded, as a list sorted by start time together with a running maximum
+of end times, so "is [start, end) free?" is a single bisect instead of a
+SQL overlap scan. A reported conflict is confirmed with that scan before
+it is returned, so a stale entry can't turn a free slot away.
+"""
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.booking import Booking, BookingStatus, BOOKING_NO_OVERLAP_CONSTRAINT
+
+ACTIVE_STATUSES = (BookingStatus.confirmed, BookingStatus.pending)
+
+EXCLUSION_VIOLATION = "23P01"
+
+
+def is_overlap_violation(exc: IntegrityError) -> bool:
+    """Whether a failed write was rejected by the bookings no-overlap constraint."""
+    return (
+        getattr(exc.orig, "sqlstate", None) == EXCLUSION_VIOLATION
+        or BOOKING_NO_OVERLAP_CONSTRAINT in str(exc.orig)
+    )
+
+
+def as_utc(value: datetime) -> datetime:
+    """Normalize a datetime to aware UTC (naive values are treated as UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class SpaceIntervals:
+    """Sorted active booking intervals for a single space."""
+
+    def __init__(self, intervals: list[tuple[datetime, datetime, int]], horizon: datetime):
+        # Bookings ending before this weren't loaded
+        self.horizon = horizon
+        self._intervals = sorted(intervals)
+        self._starts = [start for start, _, _ in self._intervals]
+        self._max_ends: list[datetime] = []
+        self._rebuild_max_ends(0)
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def _rebuild_max_ends(self, from_index: int) -> None:
+        del self._max_ends[from_index:]
+        running = self._max_ends[-1] if self._max_ends else None
+        for _, end, _ in self._intervals[from_index:]:
+            running = end if running is None or end > running else running
+            self._max_ends.append(running)
+
+    def add(self, booking_id: int, start: datetime, end: datetime) -> None:
+        self.remove(booking_id)
+        entry = (start, end, booking_id)
+        insort(self._intervals, entry)
+        index = bisect_left(self._intervals, entry)
+        self._starts.insert(index, start)
+        self._rebuild_max_ends(index)
+
+    def remove(self, booking_id: int) -> None:
+        for index, (_, _, existing_id) in enumerate(self._intervals):
+            if existing_id == booking_id:
+                del self._intervals[index]
+                del self._starts[index]
+                self._rebuild_max_ends(index)
+                return
+
+    def overlaps(
+        self,
+        start: datetime,
+        end: datetime,
+        exclude_booking_id: Optional[int] = None,
+    ) -> bool:
+        # Only intervals starting before `end` can overlap; among those, the
+        # running max of their ends tells us whether any reaches past `start`.
+        candidates = bisect_left(self._starts, end)
+        if candidates == 0 or self._max_ends[candidates - 1] <= start:
+            return False
+
+        if exclude_booking_id is None:
+            return True
+
+        for index in range(candidates - 1, -1, -1):
+            _, interval_end, booking_id = self._intervals[index]
+            if booking_id != exclude_booking_id and interval_end > start:
+                return True
+            if index and self._max_ends[index - 1] <= start:
+                break
+        return False
+
+
+class BookingIntervalIndex:
+    """Per-space interval index, loaded lazily from the database."""
+
+    def __init__(self, ttl_seconds: int):
+        self._ttl_seconds = ttl_seconds
+        self._spaces: dict[int, SpaceIntervals] = {}
+        # Bumped by every sync/invalidate, so a load that raced one is not kept
+        self._generation = 0
+        self._space_generations: dict[int, int] = {}
+
+    def _generation_of(self, space_id: int) -> tuple[int, int]:
+        return self._generation, self._space_generations.get(space_id, 0)
+
+    def _touch(self, space_id: int) -> None:
+        self._space_generations[space_id] = self._space_generations.get(space_id, 0) + 1
+
+    def _fresh(self, space_id: int) -> Optional[SpaceIntervals]:
+        intervals = self._spaces.get(space_id)
+        if intervals is None:
+            return None
+        if time.monotonic() - intervals.loaded_at > self._ttl_seconds:
+            del self._spaces[space_id]
+            return None
+        return intervals
+
+    async def load(self, db: AsyncSession, space_id: int) -> SpaceIntervals:
+        intervals = self._fresh(space_id)
+        if intervals is not None:
+            return intervals
+
+        generation = self._generation_of(space_id)
+        horizon = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(Booking.start_time, Booking.end_time, Booking.id).where(
+                Booking.space_id == space_id,
+                Booking.status.in_(ACTIVE_STATUSES),
+                Booking.end_time > horizon,
+            )
+        )
+        intervals = SpaceIntervals(
+            [(as_utc(start), as_utc(end), booking_id) for start, end, booking_id in result.all()],
+            horizon,
+        )
+        # Don't publish rows that a booking write for this space made stale
+        # mid-load (this request still answers from what it read)
+        if generation == self._generation_of(space_id):
+            self._spaces[space_id] = intervals
+        return intervals
+
+    async def _overlap_in_db(
+        self,
+        db: AsyncSession,
+        space_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_booking_id: Optional[int],
+    ) -> bool:
+        query = select(Booking.id).where(
+            Booking.space_id == space_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.start_time < end_time,
+            Booking.end_time > start_time,
+        )
+        if exclude_booking_id is not None:
+            query = query.where(Booking.id != exclude_booking_id)
+        return bool(await db.scalar(select(exists(query))))
+
+    async def has_conflict(
+        self,
+        db: AsyncSession,
+        space_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_booking_id: Optional[int] = None,
+    ) -> bool:
+        intervals = await self.load(db, space_id)
+        start, end = as_utc(start_time), as_utc(end_time)
+        if start < intervals.horizon:
+            # Reaches back before the loaded bookings
+            return await self._overlap_in_db(db, space_id, start_time, end_time, exclude_booking_id)
+        if not intervals.overlaps(start, end, exclude_booking_id):
+            return False
+        # Conflicts are rare, so confirm them against the database in case
+        # the index is stale (e.g. a missed invalidation from another worker)
+        if await self._overlap_in_db(db, space_id, start_time, end_time, exclude_booking_id):
+            return True
+        self.invalidate(space_id)
+        return False
+
+    def sync(self, booking: Booking) -> None:
+        """Reflect a committed booking (new, cancelled or edited) in the index."""
+        self._touch(booking.space_id)
+        intervals = self._spaces.get(booking.space_id)
+        if intervals is None:
+            return
+
+        if booking.status in ACTIVE_STATUSES:
+            intervals.add(booking.id, as_utc(booking.start_time), as_utc(booking.end_time))
+        else:
+            intervals.remove(booking.id)
+
+    def invalidate(self, space_id: Optional[int] = None) -> None:
+        if space_id is None:
+            self._generation += 1
+            self._spaces.clear()
+        else:
+            self._touch(space_id)
+            self._spaces.pop(space_id, None)
+
+
+booking_index = BookingIntervalIndex(ttl_seconds=settings.booking_index_ttl_seconds)
@@ -0,0 +1,147 @@
+"""
+In-process cache of the space catalog.
+
+Spaces change only through the admin endpoints, which call
+`spaces_changed()` after committing to invalidate it in every worker.
+Every space is serialized once per load into an immutable snapshot;
+listings are filtered in memory and joined from the pre-serialized JSON
+fragments, with an ETag (from the same snapshot) for conditional requests.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.space import Space
+from app.schemas.space import SpaceResponse
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: int
+    name: str
+    type: str
+    location: str
+    capacity: int
+    price_per_hour: float
+    is_active: bool
+    json: bytes
+
+    def matches(
+        self,
+        type: Optional[str],
+        location: Optional[str],
+        min_capacity: Optional[int],
+        max_price: Optional[float],
+    ) -> bool:
+        """Same semantics as the SQL filters previously used by list_spaces."""
+        if not self.is_active:
+            return False
+        if type and self.type != type:
+            return False
+        if location and location.lower() not in self.location.lower():
+            return False
+        if min_capacity and self.capacity < min_capacity:
+            return False
+        if max_price and self.price_per_hour > max_price:
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    entries: list[CatalogEntry]
+    by_id: dict[int, CatalogEntry]
+    # Content hash, for ETags
+    version: str
+
+    def list(
+        self,
+        type: Optional[str] = None,
+        location: Optional[str] = None,
+        min_capacity: Optional[int] = None,
+        max_price: Optional[float] = None,
+    ) -> list[CatalogEntry]:
+        """Active spaces matching the filters, ordered by name."""
+        return [entry for entry in self.entries if entry.matches(type, location, min_capacity, max_price)]
+
+    def get(self, space_id: int) -> Optional[CatalogEntry]:
+        return self.by_id.get(space_id)
+
+
+class SpaceCatalog:
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._generation = 0
+
+    async def load(self, db: AsyncSession) -> CatalogSnapshot:
+        """The current snapshot; use it for both the lookup and the ETag."""
+        if self._snapshot is not None:
+            return self._snapshot
+
+        generation = self._generation
+        result = await db.execute(select(Space).order_by(Space.name))
+        entries = [
+            CatalogEntry(
+                id=space.id,
+                name=space.name,
+                type=space.type,
+                location=space.location,
+                capacity=space.capacity,
+                price_per_hour=float(space.price_per_hour),
+                is_active=space.is_active,
+                json=SpaceResponse.model_validate(space).model_dump_json().encode(),
+            )
+            for space in result.scalars().all()
+        ]
+
+        snapshot = CatalogSnapshot(
+            entries=entries,
+            by_id={entry.id: entry for entry in entries},
+            version=hashlib.sha1(b"".join(entry.json for entry in entries)).hexdigest()[:16],
+        )
+        # Don't publish a snapshot that an admin write invalidated mid-load
+        # (this request still answers from what it read)
+        if generation == self._generation:
+            self._snapshot = snapshot
+        return snapshot
+
+    async def list(
+        self,
+        db: AsyncSession,
+        type: Optional[str] = None,
+        location: Optional[str] = None,
+        min_capacity: Optional[int] = None,
+        max_price: Optional[float] = None,
+    ) -> list[CatalogEntry]:
+        """Active spaces matching the filters, ordered by name."""
+        snapshot = await self.load(db)
+        return snapshot.list(type, location, min_capacity, max_price)
+
+    async def get(self, db: AsyncSession, space_id: int) -> Optional[CatalogEntry]:
+        snapshot = await self.load(db)
+        return snapshot.get(space_id)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._snapshot = None
+
+
+space_catalog = SpaceCatalog()
+
+
+def etag_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve pre-serialized JSON, answering 304 when the client's copy is current."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def catalog_etag(snapshot: CatalogSnapshot, *parts) -> str:
+    key = "|".join("" if part is None else str(part) for part in parts)
+    return f'"{snapshot.version}-{hashlib.sha1(key.encode()).hexdigest()[:12]}"'
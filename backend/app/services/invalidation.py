@@ -0,0 +1,168 @@
+"""
+Cross-process cache invalidation.
+
+Every worker process keeps its own in-memory caches: the space catalog, the
+booking interval index, verified tokens and the agent caches. Writers call
+the functions below after committing. They drop the local entries and, on
+PostgreSQL, publish the change with NOTIFY on CHANNEL; every other worker
+(in this container or another) LISTENs and drops its copies too.
+
+Notifications are best effort. If the listening connection drops, a worker
+clears all of its caches when it reconnects, since it may have missed
+messages. Booking conflicts stay safe in the meantime because the database
+exclusion constraint is the final check.
+"""
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import make_url
+
+from app.agent.cache import agent_cache
+from app.core.config import settings
+from app.core.security import token_cache
+from app.services.booking_index import booking_index
+from app.services.catalog import space_catalog
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+RECONNECT_DELAY_SECONDS = 5
+
+
+def _apply(event: dict) -> None:
+    kind = event.get("kind")
+    if kind == "spaces":
+        space_catalog.invalidate()
+        agent_cache.invalidate_spaces()
+    elif kind == "bookings":
+        for space_id in event["space_ids"]:
+            booking_index.invalidate(space_id)
+            agent_cache.invalidate_bookings(space_id)
+    elif kind == "user":
+        token_cache.invalidate_user(event["user_id"])
+    else:
+        logger.warning("Ignoring unknown cache invalidation %r", event)
+
+
+def _clear_all() -> None:
+    space_catalog.invalidate()
+    booking_index.invalidate()
+    token_cache.clear()
+    agent_cache.clear()
+
+
+class InvalidationChannel:
+    """LISTEN/NOTIFY connection of this worker (a no-op until started)."""
+
+    def __init__(self):
+        self._connection = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._lost: Optional[asyncio.Event] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        # Our own NOTIFYs come back to us too; they're already applied
+        if pid == connection.get_server_pid():
+            return
+        try:
+            _apply(json.loads(payload))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed cache invalidation payload %r", payload)
+
+    def _on_terminate(self, connection) -> None:
+        self._lost.set()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        # NOTIFY goes through the primary (standbys can't LISTEN), with a
+        # plain libpq URL rather than the SQLAlchemy driver form
+        dsn = make_url(settings.database_url).set(drivername="postgresql")
+        connection = await asyncpg.connect(dsn.render_as_string(hide_password=False))
+        await connection.add_listener(CHANNEL, self._on_notify)
+        connection.add_termination_listener(self._on_terminate)
+        self._lost.clear()
+        self._connection = connection
+
+    async def _supervise(self) -> None:
+        while True:
+            await self._lost.wait()
+            self._connection = None
+            logger.warning("Cache invalidation channel lost; reconnecting")
+            while True:
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                try:
+                    await self._connect()
+                    break
+                except Exception:
+                    logger.exception("Cache invalidation channel reconnect failed")
+            _clear_all()
+
+    async def start(self) -> None:
+        if make_url(settings.database_url).get_backend_name() != "postgresql":
+            return
+        self._lost = asyncio.Event()
+        await self._connect()
+        self._task = asyncio.create_task(self._supervise())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.connected:
+            await self._connection.close()
+        self._connection = None
+
+    async def publish(self, event: dict) -> None:
+        if not self.connected:
+            return
+        try:
+            # One asyncpg connection runs one statement at a time
+            async with self._lock:
+                await self._connection.execute(
+                    "SELECT pg_notify($1, $2)", CHANNEL, json.dumps(event)
+                )
+        except Exception:
+            # The write is already committed; other workers catch up via TTLs
+            logger.exception("Failed to publish cache invalidation %r", event)
+
+
+invalidation_channel = InvalidationChannel()
+
+
+@asynccontextmanager
+async def listen_for_invalidations() -> AsyncIterator[InvalidationChannel]:
+    """Keep this worker subscribed to invalidations for the lifetime of the app."""
+    await invalidation_channel.start()
+    try:
+        yield invalidation_channel
+    finally:
+        await invalidation_channel.stop()
+
+
+async def spaces_changed() -> None:
+    """Call after committing a change to any space."""
+    _apply({"kind": "spaces"})
+    await invalidation_channel.publish({"kind": "spaces"})
+
+
+async def bookings_changed(*space_ids: int) -> None:
+    """Call after committing booking changes for `space_ids` (once the local
+    booking index has been synced with them)."""
+    space_ids = sorted(set(space_ids))
+    for space_id in space_ids:
+        agent_cache.invalidate_bookings(space_id)
+    await invalidation_channel.publish({"kind": "bookings", "space_ids": space_ids})
+
+
+async def user_changed(user_id: int) -> None:
+    """Call after committing a change to a user's role or status."""
+    _apply({"kind": "user", "user_id": user_id})
+    await invalidation_channel.publish({"kind": "user", "user_id": user_id})
@@ -0,0 +1,120 @@
+"""
+Incremental maintenance of the booking_daily_rollups table.
+
+Every booking write computes the booking's contribution to the rollup
+before and after the change and upserts the difference in the same
+transaction, so dashboard queries never have to scan bookings.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.booking import Booking, BookingStatus
+from app.models.rollup import BookingDailyRollup
+from app.services.booking_index import as_utc
+
+REVENUE_STATUSES = (BookingStatus.confirmed, BookingStatus.completed)
+
+
+class BookingState(NamedTuple):
+    space_id: int
+    status: BookingStatus
+    start_time: datetime
+    created_at: datetime
+    total_price: Decimal
+
+
+def booking_state(booking: Booking) -> BookingState:
+    """Snapshot the columns that feed the rollup (take it before mutating)."""
+    return BookingState(
+        space_id=booking.space_id,
+        status=booking.status,
+        start_time=booking.start_time,
+        created_at=booking.created_at,
+        total_price=Decimal(str(booking.total_price)),
+    )
+
+
+def _contributions(state: BookingState, sign: int, totals: dict) -> None:
+    created_day = as_utc(state.created_at).date()
+    totals[(created_day, state.space_id)][0] += sign
+    if state.status in REVENUE_STATUSES:
+        totals[(created_day, state.space_id)][2] += sign * state.total_price
+    if state.status == BookingStatus.confirmed:
+        totals[(as_utc(state.start_time).date(), state.space_id)][1] += sign
+
+
+def _upsert(dialect_name: str, day: date, space_id: int, created: int, confirmed: int, revenue: Decimal):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    table = BookingDailyRollup.__table__
+    stmt = insert(table).values(
+        day=day,
+        space_id=space_id,
+        bookings_created=created,
+        bookings_confirmed=confirmed,
+        revenue=revenue,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.space_id],
+        set_={
+            "bookings_created": table.c.bookings_created + created,
+            "bookings_confirmed": table.c.bookings_confirmed + confirmed,
+            "revenue": table.c.revenue + revenue,
+        },
+    )
+
+
+async def apply_booking_change(
+    db: AsyncSession,
+    before: Optional[BookingState],
+    after: Optional[BookingState],
+) -> None:
+    """Upsert the rollup delta of a booking going from `before` to `after`.
+
+    Call before committing so the rollup and the booking change together.
+    """
+    totals: dict = defaultdict(lambda: [0, 0, Decimal(0)])
+    if before is not None:
+        _contributions(before, -1, totals)
+    if after is not None:
+        _contributions(after, 1, totals)
+
+    dialect_name = db.get_bind().dialect.name
+    for (day, space_id), (created, confirmed, revenue) in totals.items():
+        if created or confirmed or revenue:
+            await db.execute(_upsert(dialect_name, day, space_id, created, confirmed, revenue))
+
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """Recompute the whole rollup table from bookings; returns rows written."""
+    totals: dict = defaultdict(lambda: [0, 0, Decimal(0)])
+    result = await db.stream(
+        select(
+            Booking.space_id,
+            Booking.status,
+            Booking.start_time,
+            Booking.created_at,
+            Booking.total_price,
+        )
+    )
+    async for row in result:
+        _contributions(BookingState(*row), 1, totals)
+
+    await db.execute(delete(BookingDailyRollup))
+    db.add_all(
+        BookingDailyRollup(
+            day=day,
+            space_id=space_id,
+            bookings_created=created,
+            bookings_confirmed=confirmed,
+            revenue=revenue,
+        )
+        for (day, space_id), (created, confirmed, revenue) in totals.items()
+    )
+    await db.flush()
+    return len(totals)
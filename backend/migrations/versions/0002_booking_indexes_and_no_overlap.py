@@ -0,0 +1,67 @@
+"""booking and user indexes, no-overlap exclusion constraint
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:10:00
+
+Indexes for the availability, "my bookings", admin listing and keyset
+pagination queries, plus the PostgreSQL exclusion constraint that rejects
+overlapping active bookings of a space (needs btree_gist). Everything is
+skipped if it already exists, so databases adopted from create_all pass
+through cleanly. Adding the constraint fails if active bookings already
+overlap; resolve those first.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BOOKING_INDEXES = {
+    "ix_bookings_space_id_start_time": ["space_id", "start_time"],
+    "ix_bookings_user_id_start_time": ["user_id", "start_time"],
+    "ix_bookings_status_start_time": ["status", "start_time"],
+    "ix_bookings_start_time_id": ["start_time", "id"],
+    "ix_bookings_created_at": ["created_at"],
+}
+
+NO_OVERLAP_CONSTRAINT = "bookings_no_overlap"
+
+
+def _has_constraint(name: str) -> bool:
+    # Offline SQL (--sql) can't look, and targets a fresh database
+    if context.is_offline_mode():
+        return False
+    return op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": name}
+    ).first() is not None
+
+
+def upgrade() -> None:
+    for name, columns in BOOKING_INDEXES.items():
+        op.create_index(name, "bookings", columns, if_not_exists=True)
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"], if_not_exists=True)
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    if not _has_constraint(NO_OVERLAP_CONSTRAINT):
+        op.execute(
+            f"ALTER TABLE bookings ADD CONSTRAINT {NO_OVERLAP_CONSTRAINT} "
+            "EXCLUDE USING gist (space_id WITH =, tstzrange(start_time, end_time) WITH &&) "
+            "WHERE (status IN ('confirmed', 'pending'))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(f"ALTER TABLE bookings DROP CONSTRAINT IF EXISTS {NO_OVERLAP_CONSTRAINT}")
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    for name in reversed(BOOKING_INDEXES):
+        op.drop_index(name, table_name="bookings")
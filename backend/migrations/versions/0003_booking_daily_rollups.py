@@ -0,0 +1,97 @@
+"""booking_daily_rollups table, backfilled from bookings
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:20:00
+
+The per-space, per-day counters behind the admin dashboard. The backfill
+recomputes every row from bookings with the same rules as
+app.services.rollups, replacing whatever an adopted database already had.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REVENUE_STATUSES = ("confirmed", "completed")
+
+bookings = sa.table(
+    "bookings",
+    sa.column("space_id", sa.Integer),
+    sa.column("status", sa.String),
+    sa.column("start_time", sa.DateTime(timezone=True)),
+    sa.column("created_at", sa.DateTime(timezone=True)),
+    sa.column("total_price", sa.Numeric(10, 2)),
+)
+
+
+def _utc_day(value: datetime):
+    # SQLite hands back naive datetimes, which are stored as UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def upgrade() -> None:
+    rollups = op.create_table(
+        "booking_daily_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("space_id", sa.Integer(), nullable=False),
+        sa.Column("bookings_created", sa.Integer(), nullable=False),
+        sa.Column("bookings_confirmed", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Numeric(12, 2), nullable=False),
+        sa.ForeignKeyConstraint(["space_id"], ["spaces.id"]),
+        sa.PrimaryKeyConstraint("day", "space_id"),
+        if_not_exists=True,
+    )
+    # Offline SQL (--sql) can't read bookings; it targets a fresh database
+    if context.is_offline_mode():
+        return
+
+    totals: dict = defaultdict(lambda: [0, 0, Decimal(0)])
+    result = op.get_bind().execute(
+        sa.select(
+            bookings.c.space_id,
+            bookings.c.status,
+            bookings.c.start_time,
+            bookings.c.created_at,
+            bookings.c.total_price,
+        )
+    )
+    for space_id, status, start_time, created_at, total_price in result:
+        created = totals[(_utc_day(created_at), space_id)]
+        created[0] += 1
+        if status in REVENUE_STATUSES:
+            created[2] += Decimal(str(total_price))
+        if status == "confirmed":
+            totals[(_utc_day(start_time), space_id)][1] += 1
+
+    op.execute(rollups.delete())
+    if totals:
+        op.bulk_insert(
+            rollups,
+            [
+                {
+                    "day": day,
+                    "space_id": space_id,
+                    "bookings_created": created,
+                    "bookings_confirmed": confirmed,
+                    "revenue": revenue,
+                }
+                for (day, space_id), (created, confirmed, revenue) in totals.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("booking_daily_rollups")
@@ -1,7 +1,7 @@
 "use client";
 
 import { useState, useRef, useEffect } from "react";
-import { chatWithAgent, ChatMessage, ApiError } from "@/lib/api";
+import { streamChatWithAgent, ChatMessage, ApiError } from "@/lib/api";
 import { useAuth } from "@/context/AuthContext";
 import { LoadingSpinner } from "@/components/LoadingSpinner";
 import { MessageCircle, X, Send, Sparkles, Building2, Calendar, MapPin, Users } from "lucide-react";
@@ -12,9 +12,12 @@ export function ChatWidget() {
   const { isAuthenticated } = useAuth();
   const [isOpen, setIsOpen] = useState(false);
   const [messages, setMessages] = useState<ChatMessage[]>([]);
+  // Server-side conversation thread; history itself stays on the server
+  const [threadId, setThreadId] = useState<string | null>(null);
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState("");
+  const [activity, setActivity] = useState("");
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   const scrollToBottom = () => {
@@ -41,8 +44,22 @@ export function ChatWidget() {
     setIsLoading(true);
 
     try {
-      const response = await chatWithAgent(userMessage, messages);
-      setMessages(response.conversation_history);
+      // Show tokens as they arrive; the final response replaces the draft
+      let draft = "";
+      const response = await streamChatWithAgent(userMessage, threadId, (event) => {
+        if (event.event === "token") {
+          draft += event.data.content;
+          setMessages([...updatedMessages, { role: "assistant", content: draft }]);
+        } else if (event.event === "tool_start") {
+          draft = "";
+          setMessages(updatedMessages);
+          setActivity(event.data.name.replace(/_/g, " "));
+        } else if (event.event === "tool_end") {
+          setActivity("");
+        }
+      });
+      setThreadId(response.thread_id);
+      setMessages([...updatedMessages, { role: "assistant", content: response.response }]);
     } catch (err) {
       if (err instanceof ApiError) {
         setError(err.message);
@@ -52,11 +69,13 @@ export function ChatWidget() {
       setMessages(messages);
     } finally {
       setIsLoading(false);
+      setActivity("");
     }
   };
 
   const handleClearChat = () => {
     setMessages([]);
+    setThreadId(null);
     setError("");
   };
 
@@ -184,7 +203,9 @@ export function ChatWidget() {
                 <div className="bg-white border border-slate-200 px-5 py-3.5 rounded-2xl rounded-bl-sm shadow-sm">
                   <div className="flex items-center gap-2">
                     <LoadingSpinner size="sm" />
-                    <span className="text-xs text-slate-400">Thinking...</span>
+                    <span className="text-xs text-slate-400">
+                      {activity ? `Running ${activity}...` : "Thinking..."}
+                    </span>
                   </div>
                 </div>
               </div>
@@ -78,6 +78,21 @@ export interface SpaceAvailability {
   available_slots: TimeSlot[];
 }
 
+export interface SpaceAvailabilityRange {
+  space_id: number;
+  date_from: string;
+  date_to: string;
+  slots: string[];
+  days: { date: string; available: boolean[] }[];
+}
+
+// Bit i of each mask is set when slots[i] is available
+export interface SpaceAvailabilityMatrix {
+  date: string;
+  slots: string[];
+  spaces: { space_id: number; name: string; mask: number }[];
+}
+
 export interface DashboardStats {
   total_spaces: number;
   total_users: number;
@@ -157,6 +172,34 @@ export async function getSpaceAvailability(spaceId: number, date: string): Promi
   return apiRequest<SpaceAvailability>(`/spaces/${spaceId}/availability?date=${date}`);
 }
 
+export async function getSpaceAvailabilityRange(
+  spaceId: number,
+  dateFrom: string,
+  dateTo: string
+): Promise<SpaceAvailabilityRange> {
+  return apiRequest<SpaceAvailabilityRange>(
+    `/spaces/${spaceId}/availability/range?date_from=${dateFrom}&date_to=${dateTo}`
+  );
+}
+
+export async function getAvailabilityMatrix(
+  date: string,
+  params?: {
+    type?: string;
+    location?: string;
+    min_capacity?: number;
+    max_price?: number;
+  }
+): Promise<SpaceAvailabilityMatrix> {
+  const searchParams = new URLSearchParams({ date });
+  if (params?.type) searchParams.append("type", params.type);
+  if (params?.location) searchParams.append("location", params.location);
+  if (params?.min_capacity) searchParams.append("min_capacity", params.min_capacity.toString());
+  if (params?.max_price) searchParams.append("max_price", params.max_price.toString());
+
+  return apiRequest<SpaceAvailabilityMatrix>(`/spaces/availability?${searchParams.toString()}`);
+}
+
 // Admin Spaces API
 export async function createSpace(data: Omit<Space, "id" | "created_at" | "is_active">): Promise<Space> {
   return apiRequest<Space>("/spaces", {
@@ -240,22 +283,98 @@ export interface ChatMessage {
 
 export interface ChatResponse {
   response: string;
-  conversation_history: ChatMessage[];
+  // Pass back on the next message to continue the conversation
+  thread_id: string;
 }
 
 export async function chatWithAgent(
   message: string,
-  conversationHistory?: ChatMessage[]
+  threadId?: string | null
 ): Promise<ChatResponse> {
   return apiRequest<ChatResponse>("/agent/chat", {
     method: "POST",
     body: JSON.stringify({
       message,
-      conversation_history: conversationHistory || [],
+      thread_id: threadId || null,
     }),
   });
 }
 
+export type ChatStreamEvent =
+  | { event: "token"; data: { content: string } }
+  | { event: "tool_start"; data: { name: string; input: Record<string, unknown> } }
+  | { event: "tool_end"; data: { name: string } }
+  | { event: "done"; data: ChatResponse }
+  | { event: "error"; data: { detail: string } };
+
+// Streams agent events (Server-Sent Events) and resolves with the final response
+export async function streamChatWithAgent(
+  message: string,
+  threadId: string | null | undefined,
+  onEvent: (event: ChatStreamEvent) => void
+): Promise<ChatResponse> {
+  const token = await getAccessToken();
+  const headers: Record<string, string> = { "Content-Type": "application/json" };
+  if (token) {
+    headers["Authorization"] = `Bearer ${token}`;
+  }
+
+  const response = await fetch(`${API_BASE_URL}/agent/chat/stream`, {
+    method: "POST",
+    headers,
+    body: JSON.stringify({
+      message,
+      thread_id: threadId || null,
+    }),
+  });
+
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({ detail: "Unknown error" }));
+    throw new ApiError(response.status, error.detail || "Request failed");
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let result: ChatResponse | null = null;
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      let eventName = "message";
+      let data = "";
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event: ")) eventName = line.slice(7);
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!data) continue;
+
+      const event = { event: eventName, data: JSON.parse(data) } as ChatStreamEvent;
+      if (event.event === "error") {
+        throw new ApiError(500, event.data.detail);
+      }
+      if (event.event === "done") {
+        result = event.data;
+      }
+      onEvent(event);
+    }
+  }
+
+  if (!result) {
+    throw new ApiError(500, "Stream ended before the response was complete");
+  }
+  return result;
+}
+
 export async function getAgentStatus(): Promise<{ status: string; message: string }> {
   return apiRequest<{ status: string; message: string }>("/agent/status");
 }